@@ -8,153 +8,2270 @@ Following classes are essential:
 
 - AlphaClient (Used to connect to other clients or switches)  
 - AlphaSwitch (Used to manage data flows)
+- AsyncAlphaClient (Used to send many concurrent requests over one connection)
 """
 
+import os
+import re
+import abc
+import errno
+import json
+import random
+import bisect
+import asyncio
 import time
 import socket
-from typing import Union
+import struct
+import selectors
+import queue
+import threading
+import multiprocessing
+import multiprocessing.connection
+import weakref
+import traceback
+import zlib
+try: import lzma
+except ImportError: lzma = None #Python built without lzma support
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterator, NamedTuple, Union
 from datetime import datetime
 
+_FRAME_MAGIC: int = 0xA1 #First byte of a frame (a text packet always starts with a port digit)
+_FRAME_VERSION: int = 1
+_FRAME_HEADER = struct.Struct("!BBBHHI") #magic, version, flags, sender_port, recipient_port, payload_length
+_FRAME_HINT: str = "+frame/1" #Appended to the registration message to negotiate the framed protocol
+_FLAG_STATUS: int = 0x01 #The payload is a status message of the switch ($R1, $E4, $E5, port list)
+_FLAG_AGGREGATE: int = 0x02 #The payload contains the collected responses of a broadcast/multicast
+_FLAG_TAGGED: int = 0x04 #The payload starts with a correlation ID that is echoed in the response (AsyncAlphaClient)
+_FLAG_CACHEABLE: int = 0x08 #Response flag: the switch may cache the response (AlphaReply)
+_FLAG_UNCACHEABLE: int = 0x10 #Response flag: the switch must not cache the response
+_FLAG_BATCH: int = 0x20 #The payload contains many requests/responses (AlphaClient.requestBatch())
+_FLAG_STREAM: int = 0x40 #The frame is a chunk of a stream (AlphaClient.requestStream()), its payload starts with the chunk kind
+_TAG = struct.Struct("!I") #Correlation ID of a tagged frame
+_AGGREGATE_RECORD = struct.Struct("!HBI") #recipient_port, status, response_length (followed by the response)
+_BATCH_REQUEST = struct.Struct("!HI") #recipient_port, message_length (followed by the message) of a batch sent to the switch
+_BATCH_ENTRY = struct.Struct("!BI") #flags, length (followed by the message/response) of a batch forwarded to one recipient
+_CAST_OK, _CAST_TIMEOUT, _CAST_FAILED = 0, 1, 2 #Status of every recipient of a broadcast/multicast
+
+_STATUS_FORWARDED, _STATUS_REGISTERED, _STATUS_CONTROL, _STATUS_CACHED, _STATUS_NOT_FOUND, _STATUS_NO_RESPONSE, _STATUS_REJECTED = 0, 1, 2, 3, 4, 5, 6 #Status of a logged packet ($R1, $E4, $E5, $E6)
+_NOT_FOUND_MESSAGE: str = "$E4 [NotFound] 'This client is not connected to the network.'"
+_NO_RESPONSE_MESSAGE: str = "$E5 [NoResponse] 'The client has been disconnected or traffic could be high? (request-timeout?)'"
+_CIRCUIT_OPEN_MESSAGE: str = "$E5 [NoResponse] 'The client is not responding, retry later. (circuit-open)'"
+_OVERLOADED_MESSAGE: str = "$E6 [Overloaded] 'The switch is overloaded, retry later. (queue-full)'"
+_RATE_LIMITED_MESSAGE: str = "$E6 [Overloaded] 'Too many packets from this client, retry later. (rate-limit)'"
+_QUEUE_WAIT: float = 5.0 #Seconds a request waits for the next confirmationResponse() call before it is answered with None
+_HANDLER_ERROR_MESSAGE: str = "$E7 [HandlerError] 'The client failed to answer the request.'"
+_NO_STREAM_MESSAGE: str = "$E4 [NotFound] 'The client does not support streams.'"
+_SHARD_STATS_TIMEOUT: float = 1.0 #Seconds the parent of a sharded switch waits for the workers to flush before answering statistics
+_REJECT_TIMEOUT: float = 0.05 #Seconds the selector thread waits (in total) for the header of a rejected packet
+_MSG_DONTWAIT: int = getattr(socket, "MSG_DONTWAIT", 0) #Not available on Windows (a readable socket does not block anyway)
+_OVERFLOW_POLICIES: tuple = ("reject", "drop_oldest", "block") #What the switch does with a packet while its pending queue is full
+_CIRCUIT_CLOSED, _CIRCUIT_OPEN, _CIRCUIT_HALF_OPEN = "closed", "open", "half-open" #Circuit breaker states of a recipient port
+_PROBE_TIMEOUT: float = 10.0 #Seconds a half-open circuit waits for its probe before letting another one through
+_STREAM_OPEN, _STREAM_ACCEPT, _STREAM_DATA, _STREAM_COMPRESSED, _STREAM_END = 0, 1, 2, 3, 4 #Chunk kinds (first payload byte of a stream frame)
+_STREAM_CHUNK_SIZE: int = 65536 #Largest chunk a stream is split into
+_STREAM_MIN_COMPRESS: int = 512 #Smaller chunks are sent uncompressed
+_STREAM_SKIP: int = 8 #Chunks sent uncompressed after a chunk did not compress (e.g. already compressed data)
+_RELAY_BUFFER: int = 65536 #Bytes of a stream the switch relays at once (the memory a stream needs per worker thread)
+_STREAM_CODECS: dict = {"zlib": (zlib.compress, zlib.decompress)} #Name:(compress, decompress) of the stream compression codecs
+if lzma is not None: _STREAM_CODECS["lzma"] = (lzma.compress, lzma.decompress)
+_PORT_SLOTS: int = 65536 #One slot per port in the shared memory of a sharded switch
+_LATENCY_BUCKETS: tuple = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0) #Upper bounds (sec) of the latency histograms
+_HOOK_PHASES: tuple = ("accept", "parse", "connect", "send", "recv") #Forwarding phases that can be observed with AlphaSwitch.addHook()
+_LOG_MAGIC: bytes = b"NALG1" #First bytes of a traffic log file
+_LOG_ENTRY = struct.Struct("!IdIIIIdBII") #number, timestamp, sender_port, recipient_port, request_size, response_size, latency, status, request_length, response_length
+
+def _pack_frame(sender_port: int, recipient_port: int, payload: bytes, flags: int = 0) -> bytes:
+    """Encode a payload into a frame (fixed binary header + raw payload bytes)."""
+    return _FRAME_HEADER.pack(_FRAME_MAGIC, _FRAME_VERSION, flags, sender_port, recipient_port, len(payload)) + payload
+
+def _recv_into(sock: socket.socket, view: memoryview) -> None:
+    """Fill the whole buffer (a single recv may return only a part of it)."""
+    received = 0
+    while received < len(view):
+        count = sock.recv_into(view[received:])
+        if not count: raise ConnectionResetError("The connection was closed in the middle of a frame.")
+        received += count
+
+def _recv_exact(sock: socket.socket, size: int) -> bytearray:
+    """Receive exactly size bytes."""
+    buffer = bytearray(size)
+    _recv_into(sock, memoryview(buffer))
+    return buffer
+
+def _recv_within(sock: socket.socket, size: int, deadline: float) -> bytearray:
+    """Receive exactly size bytes before the deadline (time.monotonic()), however slowly the sender trickles them."""
+    buffer, received = bytearray(size), 0
+    view = memoryview(buffer)
+    while received < size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0: raise socket.timeout("timed out")
+        sock.settimeout(remaining)
+        count = sock.recv_into(view[received:])
+        if not count: raise ConnectionResetError("The connection was closed in the middle of a frame.")
+        received += count
+    return buffer
+
+def _parse_header(header) -> tuple[int, int, int, int]:
+    """
+    Parse a frame header without touching the payload.
+    Return order: (flags, sender_port, recipient_port, payload_length)
+    """
+    magic, version, flags, sender_port, recipient_port, length = _FRAME_HEADER.unpack_from(header)
+    if magic != _FRAME_MAGIC or version != _FRAME_VERSION: raise ValueError(f"Unsupported frame (magic={magic}, version={version})")
+    return (flags, sender_port, recipient_port, length)
+
+def _recv_frame(sock: socket.socket) -> tuple[int, int, int, bytearray]:
+    """
+    Receive one frame.
+    Return order: (flags, sender_port, recipient_port, payload)
+    """
+    flags, sender_port, recipient_port, length = _parse_header(_recv_exact(sock, _FRAME_HEADER.size))
+    return (flags, sender_port, recipient_port, _recv_exact(sock, length))
+
+def _parse_cast(message: bytes) -> tuple[Union[list[int], None], float, bytes]:
+    """
+    Parse a broadcast/multicast control message:
+    '@broadcast TIMEOUT MESSAGE' or '@multicast TIMEOUT PORT,PORT,... MESSAGE'
+    Return order: (ports (None = every client), timeout, message)
+    """
+    if message.startswith(b"@broadcast "):
+        _, timeout, body = message.split(b" ", 2)
+        return (None, float(timeout), body)
+    _, timeout, ports, body = message.split(b" ", 3)
+    return ([int(port) for port in ports.split(b",")], float(timeout), body)
+
+def _unpack_aggregate(payload) -> list[tuple[Union[bytes, None], int]]:
+    """Decode the collected responses of a broadcast/multicast frame into [(response_data, sender_port), ...]."""
+    responses, offset = [], 0
+    while offset < len(payload):
+        port, status, length = _AGGREGATE_RECORD.unpack_from(payload, offset)
+        offset += _AGGREGATE_RECORD.size
+        responses.append((bytes(payload[offset:offset + length]) if status == _CAST_OK else None, port))
+        offset += length
+    return responses
+
+def _pack_records(records: list[tuple], record: struct.Struct) -> bytes:
+    """Encode [(fields..., data), ...] as records (fields..., length) each followed by its data."""
+    return b"".join(record.pack(*fields, len(data)) + data for *fields, data in records)
+
+def _unpack_records(payload, record: struct.Struct) -> list[tuple]:
+    """Decode records (fields..., length) each followed by its data into [(fields..., data), ...]."""
+    records, offset = [], 0
+    while offset < len(payload):
+        *fields, length = record.unpack_from(payload, offset)
+        offset += record.size
+        records.append((*fields, bytes(payload[offset:offset + length])))
+        offset += length
+    return records
+
+def _backoff(attempt: int, base: float, maximum: float) -> float:
+    """Exponential backoff with jitter: a random delay between half and all of min(maximum, base * 2^attempt)."""
+    delay = min(maximum, base * 2 ** attempt)
+    return delay / 2 + random.random() * delay / 2
+
+def _send_parts(sock: socket.socket, *parts) -> None:
+    """Send several buffers with one scatter-gather call instead of concatenating them first."""
+    if not hasattr(sock, "sendmsg"): #Not available on Windows
+        sock.sendall(b"".join(parts))
+        return
+    views = [memoryview(part) for part in parts]
+    while views:
+        sent = sock.sendmsg(views)
+        while views and sent >= len(views[0]): sent -= len(views.pop(0))
+        if sent: views[0] = views[0][sent:]
+
+def _send_chunk(sock: socket.socket, sender_port: int, recipient_port: int, kind: int, data=b"") -> None:
+    """Send one stream frame (chunk kind + data)."""
+    _send_parts(sock, _FRAME_HEADER.pack(_FRAME_MAGIC, _FRAME_VERSION, _FLAG_STREAM, sender_port, recipient_port, 1 + len(data)), bytes((kind,)), data)
+
+def _choose_codec(offer: bytes, accepted: tuple) -> Union[str, None]:
+    """First codec of the offer (comma separated names) that is available and accepted."""
+    for name in offer.decode(errors="replace").split(","):
+        if name in _STREAM_CODECS and name in accepted: return name
+    return None
+
 class MissingAddressSetup(Exception):
     def __init__(self) -> None:
         self.message = "The Address and Port was not defined. Setup the address data using AlphaSwitch.setup(port, address) or AlphaClient.setup(port, address)"
         super().__init__(self.message)
 
-class AlphaSwitch:
+class FramingNotNegotiated(Exception):
+    def __init__(self) -> None:
+        self.message = "The framed protocol was not negotiated with the switch. Register the client using AlphaClient.registerSwitch() on a switch that supports it"
+        super().__init__(self.message)
+
+class ResponderAlreadyRunning(Exception):
+    def __init__(self) -> None:
+        self.message = "The client is already responding to requests. Stop it using AlphaClient.stopResponses() before starting another response method"
+        super().__init__(self.message)
+
+class StreamRefused(Exception):
+    def __init__(self, response: str) -> None:
+        self.response = response #Status message of the switch ($E4, $E5, $E6)
+        self.message = f"The stream was refused by the switch: {response}"
+        super().__init__(self.message)
+
+class AlphaTransport(abc.ABC):
+    """
+    Opens the listening and the outgoing sockets of switches and clients. The address selects the transport:
+    'unix:DIRECTORY' uses AF_UNIX sockets, 'local' the in-process transport and every other address TCP.
+    The switch keeps the address of every port (Port:Address) the same way for all transports, so mixed networks keep working.
+    Own transports can be added by subclassing (scheme, listen(), connect()) and calling AlphaTransport.register(transport).
+    Subclasses that do not implement listen() and connect() can not be instantiated.
+    """
+
+    scheme: str = None #Address prefix ('scheme:...') selecting the transport
+
+    @staticmethod
+    def register(transport: "AlphaTransport") -> None:
+        """Uses the transport for every address starting with 'transport.scheme'."""
+        _TRANSPORTS[transport.scheme] = transport
+
+    @abc.abstractmethod
+    def listen(self, address: str, port: int, backlog: int = 128, reuse_port: bool = False) -> socket.socket:
+        """Returns a listening socket, accept() returns (connection, (address, port)) with an address the peer can be reached at."""
+
+    @abc.abstractmethod
+    def connect(self, address: str, port: int, timeout: float = None) -> socket.socket:
+        """Returns a connected socket (raises OSError if nothing listens on the port)."""
+
+class AlphaTcpTransport(AlphaTransport):
+    """TCP sockets (Standard for IP addresses and hostnames)."""
+
+    def listen(self, address: str, port: int, backlog: int = 128, reuse_port: bool = False) -> socket.socket:
+        port_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            port_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1) #Kept-alive connections may be closed by this side first
+            if reuse_port: port_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1) #The kernel balances connections across the workers
+            port_socket.bind((address, port))
+            port_socket.listen(backlog)
+        except BaseException:
+            port_socket.close()
+            raise
+        return port_socket
+
+    def connect(self, address: str, port: int, timeout: float = None) -> socket.socket:
+        return socket.create_connection((address, port), timeout=timeout)
+
+class _TransportListener(socket.socket):
+    """Listening socket that reports the transport address of accepted connections (AF_UNIX peers are unnamed)."""
+
+    transport_address: str = None
+
+    def accept(self) -> tuple[socket.socket, tuple[str, int]]:
+        connection, _ = super().accept()
+        return (connection, (self.transport_address, 0))
+
+class AlphaUnixTransport(AlphaTransport):
+    """
+    AF_UNIX stream sockets for clients on the same host, addressed as 'unix:DIRECTORY' (one socket file per port: DIRECTORY/PORT.sock).
+    Clients that connect through a directory are expected to listen in the same directory.
+    """
+
+    scheme: str = "unix"
+
+    @staticmethod
+    def path(address: str, port: int) -> str:
+        return os.path.join(address.split(":", 1)[1], f"{port}.sock")
+
+    def listen(self, address: str, port: int, backlog: int = 128, reuse_port: bool = False) -> socket.socket:
+        path = self.path(address, port)
+        if os.path.exists(path):
+            try: self.connect(address, port, 1.0).close()
+            except OSError: os.unlink(path) #Left over by a stopped switch/client
+            else: raise OSError(errno.EADDRINUSE, "Address already in use", path)
+        port_socket = _TransportListener(socket.AF_UNIX, socket.SOCK_STREAM)
+        port_socket.transport_address = address
+        try:
+            port_socket.bind(path)
+            port_socket.listen(backlog)
+        except BaseException:
+            port_socket.close()
+            raise
+        return port_socket
+
+    def connect(self, address: str, port: int, timeout: float = None) -> socket.socket:
+        client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            client_socket.settimeout(timeout)
+            client_socket.connect(self.path(address, port))
+        except BaseException:
+            client_socket.close()
+            raise
+        return client_socket
+
+class _LocalListener:
+    """
+    Listening end of the in-process transport. Connections are socket pairs handed over in a queue,
+    every handed over connection rings a doorbell socket, so the listener can be watched by a selector.
+    """
+
+    def __init__(self, transport: "AlphaLocalTransport", address: str, port: int) -> None:
+        self.transport, self.address, self.port = transport, address, port
+        self._pending: deque = deque() #Accepting ends of the connected socket pairs
+        self._doorbell_reader, self._doorbell_writer = socket.socketpair()
+
+    def fileno(self) -> int:
+        return self._doorbell_reader.fileno()
+
+    def setblocking(self, flag: bool) -> None:
+        self._doorbell_reader.setblocking(flag)
+
+    def accept(self) -> tuple[socket.socket, tuple[str, int]]:
+        if not self._doorbell_reader.recv(1): raise OSError(errno.EBADF, "Listener closed") #Raises BlockingIOError if nothing is pending
+        return (self._pending.popleft(), (self.address, 0))
+
+    def deliver(self) -> socket.socket:
+        """Returns the connecting end of a new socket pair and queues the other end for accept()."""
+        connection, peer = socket.socketpair()
+        self._pending.append(peer)
+        self._doorbell_writer.send(b"\0")
+        return connection
+
+    def close(self) -> None:
+        self.transport.__close__(self)
+        self._doorbell_writer.close()
+        self._doorbell_reader.close()
+        while self._pending: self._pending.popleft().close()
+
+class AlphaLocalTransport(AlphaTransport):
+    """
+    In-process transport for clients running in the Python process of the switch, addressed as 'local' (or 'local:NAME').
+    Connections are socket pairs handed to the listener of the port, so packets do not pass the TCP stack.
+    """
+
+    scheme: str = "local"
+
+    def __init__(self) -> None:
+        self._listeners: dict = {} #(Address, Port):_LocalListener
+        self._lock = threading.Lock()
+
+    def listen(self, address: str, port: int, backlog: int = 128, reuse_port: bool = False) -> _LocalListener:
+        with self._lock:
+            if (address, port) in self._listeners: raise OSError(errno.EADDRINUSE, "Address already in use", f"{address}:{port}")
+            listener = self._listeners[(address, port)] = _LocalListener(self, address, port)
+        return listener
+
+    def connect(self, address: str, port: int, timeout: float = None) -> socket.socket:
+        with self._lock: listener = self._listeners.get((address, port))
+        if listener is None: raise ConnectionRefusedError(errno.ECONNREFUSED, "Connection refused", f"{address}:{port}")
+        client_socket = listener.deliver()
+        client_socket.settimeout(timeout)
+        return client_socket
+
+    def __close__(self, listener: _LocalListener) -> None:
+        with self._lock:
+            if self._listeners.get((listener.address, listener.port)) is listener: del self._listeners[(listener.address, listener.port)]
+
+_TCP_TRANSPORT = AlphaTcpTransport()
+_TRANSPORTS: dict = {AlphaUnixTransport.scheme: AlphaUnixTransport(), AlphaLocalTransport.scheme: AlphaLocalTransport()} #Scheme:Transport
+
+def _transport(address: str) -> AlphaTransport:
+    """Returns the transport selected by the address (TCP if it does not start with a registered scheme)."""
+    return _TRANSPORTS.get(address.split(":", 1)[0], _TCP_TRANSPORT) if ":" in address else _TRANSPORTS.get(address, _TCP_TRANSPORT)
+
+class AlphaConnectionPool:
+    """
+    Keep-alive connections from the switch to the registered clients, keyed by (address, port).
+    Idle connections are reused, health checked before reuse and evicted after idle_time seconds.
+
+    >>> pool = AlphaConnectionPool(max_connections=4, idle_time=30.0)
+    >>> client_socket, reused = pool.acquire("127.0.0.1", 23456)
+    >>> pool.release("127.0.0.1", 23456, client_socket)
+    """
+
+    def __init__(self, max_connections: int = 4, idle_time: float = 30.0, timeout: float = None) -> None:
+        self.max_connections: int = max_connections #Maximum amount of connections per recipient (address, port)
+        self.idle_time: float = idle_time #Seconds an unused connection is kept open
+        self.timeout: Union[float, None] = timeout #Socket timeout of new connections (None = blocking)
+
+        self._idle: dict = {} #Unused connections per recipient ((address, port):deque[(socket, last_used)])
+        self._open: dict = {} #Amount of open connections per recipient ((address, port):count)
+        self._condition = threading.Condition()
+
+    def acquire(self, address: str, port: int) -> tuple[socket.socket, bool]:
+        """
+        Returns a healthy connection to the recipient and whether it was reused.
+        Waits for a released connection if the recipient already has max_connections open.
+        """
+        key = (address, port)
+        with self._condition:
+            while True:
+                idle = self._idle.get(key)
+                while idle:
+                    client_socket, last_used = idle.pop() #Most recently used first
+                    if time.monotonic() - last_used < self.idle_time and self.__healthy__(client_socket): return (client_socket, True)
+                    self.__close__(key, client_socket)
+                if self._open.get(key, 0) < self.max_connections:
+                    self._open[key] = self._open.get(key, 0) + 1
+                    break
+                self._condition.wait()
+
+        try: return (_transport(address).connect(address, port, self.timeout), False)
+        except OSError:
+            with self._condition:
+                self._open[key] -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, address: str, port: int, client_socket: socket.socket, reusable: bool = True) -> None:
+        """Returns a connection to the pool or closes it if it can not be reused."""
+        key = (address, port)
+        with self._condition:
+            if reusable: self._idle.setdefault(key, deque()).append((client_socket, time.monotonic()))
+            else: self.__close__(key, client_socket)
+            self._condition.notify()
+
+    def evictIdle(self) -> None:
+        """Closes every connection that has been unused for longer than idle_time."""
+        deadline = time.monotonic() - self.idle_time
+        with self._condition:
+            for key, idle in list(self._idle.items()):
+                while idle and idle[0][1] < deadline: self.__close__(key, idle.popleft()[0]) #Oldest connections first
+                if not idle: del self._idle[key]
+
+    def discard(self, port: int) -> None:
+        """Closes all unused connections to the port (e.g. when the port was removed from the network)."""
+        with self._condition:
+            for key in [key for key in self._idle.keys() if key[1] == port]:
+                for client_socket, _ in self._idle.pop(key): self.__close__(key, client_socket)
+
+    def closeAll(self) -> None:
+        """Closes all unused connections."""
+        with self._condition:
+            for key, idle in self._idle.items():
+                for client_socket, _ in idle: self.__close__(key, client_socket)
+            self._idle.clear()
+
+    def __close__(self, key: tuple, client_socket: socket.socket) -> None:
+        client_socket.close()
+        self._open[key] -= 1
+        if not self._open[key]: del self._open[key]
+
+    @staticmethod
+    def __healthy__(client_socket: socket.socket) -> bool:
+        """An idle connection must neither be closed by the peer nor contain unexpected data."""
+        timeout = client_socket.gettimeout()
+        try:
+            client_socket.setblocking(False)
+            client_socket.recv(1, socket.MSG_PEEK) #Returns b"" (closed) or leftover data
+            return False
+        except BlockingIOError: return True
+        except OSError: return False
+        finally:
+            try: client_socket.settimeout(timeout)
+            except OSError: pass
+
+class _PortHealth:
+    """Circuit breaker of one recipient port."""
+    __slots__ = ("state", "failures", "retry_at")
+
+    def __init__(self) -> None:
+        self.state, self.failures, self.retry_at = _CIRCUIT_CLOSED, 0, 0.0
+
+class AlphaHealthTracker:
+    """
+    Circuit breaker for every recipient port of the switch.
+    A port that did not respond is opened (packets fail fast) for an exponentially growing, jittered time,
+    after which one probe packet is let through (half-open). A response closes the circuit again,
+    a probe without result (e.g. hanging) is replaced after _PROBE_TIMEOUT seconds.
+    Ports without failures have no entry, so healthy traffic only costs a dict lookup.
+
+    >>> virtual_switch.health.state(23456)
+    'open'
+    """
+
+    def __init__(self) -> None:
+        self._ports: dict = {} #Port:_PortHealth of ports that did not respond
+        self._lock = threading.Lock()
+
+    def allow(self, port: int) -> bool:
+        """Returns False if packets to the port should fail fast (circuit open or a probe is already running)."""
+        if port not in self._ports: return True
+        with self._lock:
+            health = self._ports.get(port)
+            if health is None: return True
+            now = time.monotonic()
+            if now >= health.retry_at: #Open circuit retried or running probe timed out
+                health.state, health.retry_at = _CIRCUIT_HALF_OPEN, now + _PROBE_TIMEOUT #Let one probe packet through
+                return True
+            return False
+
+    def success(self, port: int) -> None:
+        if port not in self._ports: return
+        with self._lock: self._ports.pop(port, None)
+
+    def failure(self, port: int, backoff: float, max_backoff: float) -> int:
+        """
+        Opens the circuit of the port for backoff * 2^(failures-1) seconds (jittered, at most max_backoff).
+        Return: consecutive failures of the port
+        """
+        with self._lock:
+            health = self._ports.get(port)
+            if health is None: health = self._ports[port] = _PortHealth()
+            health.state = _CIRCUIT_OPEN
+            health.retry_at = time.monotonic() + _backoff(health.failures, backoff, max_backoff)
+            health.failures += 1
+            return health.failures
+
+    def discard(self, port: int) -> None:
+        """Forgets the failures of the port (e.g. when it registers again)."""
+        self.success(port)
+
+    def state(self, port: int) -> str:
+        """Return: 'closed', 'open' or 'half-open'"""
+        health = self._ports.get(port)
+        return _CIRCUIT_CLOSED if health is None else health.state
+
+    def snapshot(self) -> dict:
+        """Returns the state, consecutive failures and remaining open time (sec) of every failing port."""
+        with self._lock:
+            now = time.monotonic()
+            return {str(port): {"state": health.state, "failures": health.failures, "retry_in": round(max(0.0, health.retry_at - now), 3)} for port, health in self._ports.items()}
+
+class _SharedHealthTracker(AlphaHealthTracker):
+    """AlphaHealthTracker in shared memory (one slot per port), used by the worker processes of a sharded switch."""
+    _STATES: tuple = (_CIRCUIT_CLOSED, _CIRCUIT_OPEN, _CIRCUIT_HALF_OPEN)
+
+    def __init__(self, tracker: AlphaHealthTracker = None) -> None:
+        self._failures = multiprocessing.RawArray("i", _PORT_SLOTS) #Consecutive failures (0 = closed, no lock needed)
+        self._states = multiprocessing.RawArray("b", _PORT_SLOTS) #Index of _STATES
+        self._retry_at = multiprocessing.RawArray("d", _PORT_SLOTS) #time.monotonic() (system-wide) when the circuit is half-opened
+        self._lock = multiprocessing.Lock()
+        if tracker is not None: #Take over the failures known so far
+            for port, health in tracker._ports.items():
+                self._failures[port], self._states[port], self._retry_at[port] = health.failures, self._STATES.index(health.state), health.retry_at
+
+    def allow(self, port: int) -> bool:
+        if not self._failures[port]: return True
+        with self._lock:
+            if not self._failures[port]: return True
+            now = time.monotonic()
+            if now >= self._retry_at[port]: #Open circuit retried or running probe timed out
+                self._states[port], self._retry_at[port] = 2, now + _PROBE_TIMEOUT #Let one probe packet through (from any process)
+                return True
+            return False
+
+    def success(self, port: int) -> None:
+        if not self._failures[port]: return
+        with self._lock: self._failures[port] = self._states[port] = 0
+
+    def failure(self, port: int, backoff: float, max_backoff: float) -> int:
+        with self._lock:
+            self._states[port] = 1
+            self._retry_at[port] = time.monotonic() + _backoff(self._failures[port], backoff, max_backoff)
+            self._failures[port] += 1
+            return self._failures[port]
+
+    def state(self, port: int) -> str:
+        return self._STATES[self._states[port]] if self._failures[port] else _CIRCUIT_CLOSED
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        return {str(port): {"state": self._STATES[self._states[port]], "failures": failures, "retry_in": round(max(0.0, self._retry_at[port] - now), 3)} for port, failures in enumerate(self._failures) if failures}
+
+class _ServeLoop:
+    """
+    Multiplexes a listening socket and its kept-alive connections onto a pool of worker threads.
+    handle(connection, address, detach) is called for every incoming packet and returns whether the connection is kept alive.
+    Calling detach() watches the connection for its next packet right away, so packets of one connection can be handled concurrently.
+    Packets wait for a free worker in a queue of up to max_pending packets, packets overflowing it are passed to reject() instead of handle().
+    Rejections are answered by the selector thread at once (so reject() must not block) and their connections are closed afterwards.
+    Kept-alive connections closed by the sender are closed without being queued like a packet.
+    """
+
+    def __init__(self, handle: Callable[[socket.socket, tuple, Callable[[], None]], bool], housekeeping: Callable[[], None] = None,
+                 reject: Callable[[socket.socket, tuple, Callable[[], None]], bool] = None) -> None:
+        self.handle = handle
+        self.housekeeping = housekeeping #Called about once a second (e.g. evicting idle connections)
+        self.reject = reject #Answers a packet that overflowed the queue (the connection is closed afterwards)
+        self.max_pending: Union[int, None] = None #Packets waiting for a worker before the overflow policy applies (None = no limit)
+        self.overflow: str = "reject" #Overflow policy (_OVERFLOW_POLICIES)
+        self.peak_depth: int = 0 #Most packets that waited at once
+        self.overflowed: int = 0 #Packets that found the queue full
+
+        self._pending: deque = deque() #Packets waiting for a worker (connection, address)
+        self._queue = threading.Condition()
+
+        self._running = threading.Event() #Set while serve() is running
+        self._rearm_queue: deque = deque() #Kept-alive connections waiting to be watched for their next packet
+        self._wakeup_reader, self._wakeup_writer = socket.socketpair() #Interrupts the selector
+        self._wakeup_reader.setblocking(False)
+        self._wakeup_writer.setblocking(False)
+
+    @property
+    def running(self) -> bool:
+        return self._running.is_set()
+
+    @property
+    def depth(self) -> int:
+        """Packets currently waiting for a worker."""
+        return len(self._pending)
+
+    def serve(self, port_sockets: Union[socket.socket, list], workers: int = 8) -> None:
+        """Serves the bound and listening socket(s) until stop() is called and closes them afterwards."""
+        if not isinstance(port_sockets, list): port_sockets = [port_sockets]
+        selector = selectors.DefaultSelector()
+        for port_socket in port_sockets:
+            port_socket.setblocking(False)
+            selector.register(port_socket, selectors.EVENT_READ)
+        selector.register(self._wakeup_reader, selectors.EVENT_READ)
+        self._running.set()
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="NewAlpha") as pool:
+                last_housekeeping = time.monotonic()
+                while self._running.is_set():
+                    ready = selector.select(timeout=1.0)
+                    if self.housekeeping is not None and time.monotonic() - last_housekeeping >= 1.0:
+                        self.housekeeping()
+                        last_housekeeping = time.monotonic()
+                    for key, _ in ready:
+                        if key.fileobj in port_sockets:
+                            try: connection, address = key.fileobj.accept()
+                            except BlockingIOError: continue
+                            connection.setblocking(True)
+                            self.__enqueue__(pool, connection, address)
+                        elif key.fileobj is self._wakeup_reader:
+                            try: self._wakeup_reader.recv(4096)
+                            except BlockingIOError: pass
+                            while self._rearm_queue: #Wait for the next packet on kept-alive connections
+                                connection, address = self._rearm_queue.popleft()
+                                if self._running.is_set(): selector.register(connection, selectors.EVENT_READ, address)
+                                else: connection.close()
+                        else: #Next packet arrived on a kept-alive connection
+                            selector.unregister(key.fileobj)
+                            if self.__closed__(key.fileobj): key.fileobj.close() #Not a packet, must not take a place in the queue
+                            else: self.__enqueue__(pool, key.fileobj, key.data)
+        finally:
+            self._running.clear()
+            for key in list(selector.get_map().values()):
+                if key.fileobj is not self._wakeup_reader: key.fileobj.close()
+            selector.close()
+            while self._rearm_queue: self._rearm_queue.popleft()[0].close()
+
+    def stop(self) -> None:
+        """Stops serve() after the packets currently in flight have been handled."""
+        self._running.clear()
+        self.__wakeup__()
+
+    def __wakeup__(self) -> None:
+        try: self._wakeup_writer.send(b"\0")
+        except OSError: pass
+
+    def resetCounters(self) -> None:
+        with self._queue: self.peak_depth, self.overflowed = len(self._pending), 0
+
+    def __enqueue__(self, pool: ThreadPoolExecutor, connection: socket.socket, address: tuple) -> None:
+        """Queues a packet for the workers (one worker task per queued packet) and applies the overflow policy if the queue is full."""
+        rejected = None
+        with self._queue:
+            if self.max_pending is not None and len(self._pending) >= self.max_pending:
+                self.overflowed += 1
+                if self.overflow == "block": #Stop accepting until a worker is free, the operating system queues further connections
+                    while len(self._pending) >= self.max_pending and self._running.is_set(): self._queue.wait(0.5)
+                elif self.overflow == "drop_oldest": rejected = self._pending.popleft()
+                else: rejected, connection = (connection, address), None
+            if connection is not None: self._pending.append((connection, address))
+            self.peak_depth = max(self.peak_depth, len(self._pending))
+        if rejected is None:
+            try: pool.submit(self.__work__)
+            except RuntimeError: #The interpreter is exiting (e.g. serve() in a daemon thread without stop()), stop serving
+                with self._queue:
+                    if (connection, address) in self._pending: self._pending.remove((connection, address))
+                connection.close()
+                self._running.clear()
+        else: self.__serve_connection__(*rejected, rejected=True) #Not queued behind the busy workers (a dropped packet leaves its task to the new one)
+
+    @staticmethod
+    def __closed__(connection: socket.socket) -> bool:
+        """Whether a readable connection was closed by the sender (peeks without consuming the packet)."""
+        try: return not connection.recv(1, socket.MSG_PEEK | _MSG_DONTWAIT)
+        except BlockingIOError: return False
+        except OSError: return True
+
+    def __work__(self) -> None:
+        with self._queue:
+            if not self._pending: return
+            connection, address = self._pending.popleft()
+            self._queue.notify()
+        self.__serve_connection__(connection, address)
+
+    def __serve_connection__(self, connection: socket.socket, address: tuple, rejected: bool = False) -> None:
+        detached = False
+        def detach() -> None:
+            nonlocal detached
+            detached = True
+            self.__rearm__(connection, address)
+
+        if rejected: #Answered by the selector thread, the connection is not watched for further packets
+            try:
+                if self.reject is not None: self.reject(connection, address, None)
+            except Exception: pass #Sender not ready in time or already gone
+            connection.close()
+            return
+        try: keep_alive = self.handle(connection, address, detach)
+        except Exception: keep_alive = False #Broken connection, malformed packet or failing handler
+
+        if detached: return #Already watched for its next packet
+        if not keep_alive or not self._running.is_set():
+            connection.close()
+            return
+        self.__rearm__(connection, address)
+
+    def __rearm__(self, connection: socket.socket, address: tuple) -> None:
+        self._rearm_queue.append((connection, address))
+        self.__wakeup__()
+
+class AlphaLogRecord(NamedTuple):
+    """Compact record of one handled packet (only formatted when the log is read)."""
+    number: int #Package number (transfer_count)
+    timestamp: float #time.time() when the response was sent
+    sender_port: int
+    recipient_port: int
+    request_size: int #Bytes of the request message
+    response_size: int #Bytes of the response message
+    latency: float #Seconds between receiving the request and sending the response
+    status: int #_STATUS_FORWARDED (0), _STATUS_REGISTERED (1), _STATUS_CONTROL (2), _STATUS_CACHED (3), _STATUS_NOT_FOUND (4), _STATUS_NO_RESPONSE (5), _STATUS_REJECTED (6)
+    request: str #Raw data (sPORT:Message:rPORT), message shortened to AlphaSwitch._log_preview ("" if nothing was recorded)
+    response: str #Response (sPort:Message:rPort), message shortened to AlphaSwitch._log_preview
+
+    def __str__(self) -> str:
+        date_string = datetime.fromtimestamp(self.timestamp).strftime("%d/%m/%Y %H:%M:%S")
+        return f"{date_string} Package[{self.number}]: \t {self.request} \t -> ({round(self.latency, 5)}s) -> \t {self.response}"
+
+class AlphaTrafficLog:
+    """
+    Traffic log of the switch. Keeps the newest records in a fixed-capacity ring buffer and formats them only when they are read.
+    Optionally streams every record to a rotating append-only binary file, which can be read again using AlphaTrafficLog.replay().
+    Reading it like a list (log[-1], list(log)) returns formatted log strings.
+    """
+
+    def __init__(self, capacity: int = 10000) -> None:
+        self._records: deque = deque(maxlen=capacity) #Newest records (older ones are dropped)
+        self._lock = threading.Lock()
+        self._file = None #Spill file (None = memory only)
+        self.path: str = None
+        self.max_bytes: int = 0 #Size after which the spill file is rotated
+        self.backups: int = 0 #Amount of rotated files kept (path.1, path.2, ...)
+
+    @property
+    def capacity(self) -> int:
+        return self._records.maxlen
+
+    def setCapacity(self, capacity: int) -> None:
+        """Change the amount of records kept in memory (the newest ones are kept)."""
+        with self._lock: self._records = deque(self._records, maxlen=capacity)
+
+    def spill(self, path: Union[str, None], max_bytes: int = 10_000_000, backups: int = 3) -> None:
+        """Stream every further record to the binary file at path, rotated after max_bytes (None stops streaming)."""
+        with self._lock:
+            if self._file is not None: self._file.close()
+            self._file, self.path, self.max_bytes, self.backups = None, path, max_bytes, backups
+            if path is not None: self.__open__()
+
+    def append(self, record: AlphaLogRecord) -> None:
+        with self._lock:
+            self._records.append(record)
+            if self._file is None: return
+            request, response = record.request.encode(errors="replace"), record.response.encode(errors="replace")
+            self._file.write(_LOG_ENTRY.pack(*record[:8], len(request), len(response)) + request + response)
+            if self.max_bytes and self._file.tell() >= self.max_bytes: self.__rotate__()
+
+    def flush(self) -> None:
+        """Writes buffered records to the spill file."""
+        with self._lock:
+            if self._file is not None: self._file.flush()
+
+    def query(self, port: int = None, since: float = None, until: float = None) -> list[AlphaLogRecord]:
+        """Returns the records in memory sent from/to the port within the time range (time.time() values)."""
+        with self._lock: records = list(self._records)
+        return [record for record in records if _log_match(record, port, since, until)]
+
+    @staticmethod
+    def replay(path: str, port: int = None, since: float = None, until: float = None) -> Iterator[AlphaLogRecord]:
+        """Yields the records of a spill file and its rotated files (oldest first) sent from/to the port within the time range."""
+        backups = 1
+        while os.path.exists(f"{path}.{backups}"): backups += 1
+        for file_path in [f"{path}.{index}" for index in range(backups - 1, 0, -1)] + [path]:
+            if not os.path.exists(file_path): continue
+            with open(file_path, "rb") as log_file:
+                if log_file.read(len(_LOG_MAGIC)) != _LOG_MAGIC: raise ValueError(f"{file_path} is not a NewAlpha traffic log")
+                while True:
+                    entry = log_file.read(_LOG_ENTRY.size)
+                    if len(entry) < _LOG_ENTRY.size: break #End of file (or a record that was cut off)
+                    *fields, request_length, response_length = _LOG_ENTRY.unpack(entry)
+                    request, response = log_file.read(request_length).decode(errors="replace"), log_file.read(response_length).decode(errors="replace")
+                    record = AlphaLogRecord(*fields, request, response)
+                    if _log_match(record, port, since, until): yield record
+
+    def __open__(self) -> None:
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0: self._file.write(_LOG_MAGIC)
+
+    def __rotate__(self) -> None:
+        self._file.close()
+        if self.backups:
+            for index in range(self.backups - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{index}"): os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else: os.remove(self.path)
+        self.__open__()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __getitem__(self, index: int) -> str:
+        return str(self._records[index])
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock: records = list(self._records)
+        return (str(record) for record in records)
+
+def _preview(message: Union[str, bytes, memoryview], limit: Union[int, None]) -> str:
+    """Message for the log, shortened to limit characters/bytes (None = complete)."""
+    if limit is not None and len(message) > limit: return f"{_preview(message[:limit], None)}...<{len(message)} {'characters' if isinstance(message, str) else 'bytes'}>"
+    return message if isinstance(message, str) else str(message, "utf-8", "replace")
+
+def _log_match(record: AlphaLogRecord, port: Union[int, None], since: Union[float, None], until: Union[float, None]) -> bool:
+    if port is not None and port != record.sender_port and port != record.recipient_port: return False
+    if since is not None and record.timestamp < since: return False
+    return until is None or record.timestamp <= until
+
+class _PortStats:
+    """Counters and latency histogram of one port."""
+    __slots__ = ("packets", "bytes_in", "bytes_out", "retries", "cached", "not_found", "no_response", "rejected", "histogram")
+
+    def __init__(self) -> None:
+        self.packets = self.bytes_in = self.bytes_out = self.retries = self.cached = self.not_found = self.no_response = self.rejected = 0
+        self.histogram = [0] * (len(_LATENCY_BUCKETS) + 1) #Last bucket: slower than the largest bound
+
+    def snapshot(self, uptime: float) -> dict:
+        return {
+            "packets": self.packets, "bytes_in": self.bytes_in, "bytes_out": self.bytes_out,
+            "bytes_per_sec": round((self.bytes_in + self.bytes_out) / uptime, 3) if uptime > 0 else 0.0,
+            "retries": self.retries, "cached": self.cached, "not_found": self.not_found, "no_response": self.no_response, "rejected": self.rejected,
+            "no_response_rate": round(self.no_response / self.packets, 5) if self.packets else 0.0,
+            "p50": _percentile(self.histogram, 0.50), "p90": _percentile(self.histogram, 0.90), "p99": _percentile(self.histogram, 0.99),
+        }
+
+def _percentile(histogram: list[int], quantile: float) -> Union[float, None]:
+    """Estimate a latency percentile (seconds) from a histogram by interpolating inside its bucket."""
+    total = sum(histogram)
+    if not total: return None
+    rank, seen = quantile * total, 0
+    for index, count in enumerate(histogram):
+        if count and seen + count >= rank:
+            lower = _LATENCY_BUCKETS[index - 1] if index else 0.0
+            upper = _LATENCY_BUCKETS[index] if index < len(_LATENCY_BUCKETS) else _LATENCY_BUCKETS[-1] * 2
+            return round(lower + (upper - lower) * (rank - seen) / count, 6)
+        seen += count
+    return None
+
+class AlphaMetrics:
+    """
+    Per-port counters (packets, bytes, retries, NoResponse/NotFound/Overloaded) and fixed-bucket latency histograms of the switch,
+    kept separately for every sender and recipient port. Percentiles are estimated from the histograms.
+
+    >>> virtual_switch.metrics.snapshot(port=23456)["recipients"]["23456"]["p99"]
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears every counter and histogram."""
+        with self._lock:
+            self.started = time.time()
+            self.total = _PortStats() #Every packet of the switch
+            self.senders: dict = {} #Port:_PortStats of sent packets
+            self.recipients: dict = {} #Port:_PortStats of received packets
+
+    def record(self, sender_port: int, recipient_port: int, request_size: int, response_size: int, latency: float, status: int, retries: int) -> None:
+        bucket = bisect.bisect_left(_LATENCY_BUCKETS, latency)
+        with self._lock:
+            sender, recipient = self.senders.get(sender_port), self.recipients.get(recipient_port)
+            if sender is None: sender = self.senders[sender_port] = _PortStats()
+            if recipient is None: recipient = self.recipients[recipient_port] = _PortStats()
+            for stats in (self.total, sender, recipient):
+                stats.packets += 1
+                stats.bytes_in += request_size
+                stats.bytes_out += response_size
+                stats.retries += retries
+                stats.histogram[bucket] += 1
+                if status == _STATUS_CACHED: stats.cached += 1
+                elif status == _STATUS_NOT_FOUND: stats.not_found += 1
+                elif status == _STATUS_NO_RESPONSE: stats.no_response += 1
+                elif status == _STATUS_REJECTED: stats.rejected += 1
+
+    def snapshot(self, port: int = None) -> dict:
+        """Returns all counters as dict (only those of the port if it is given), e.g. for json.dumps()."""
+        with self._lock:
+            uptime = time.time() - self.started
+            return {
+                "uptime": round(uptime, 3),
+                "total": self.total.snapshot(uptime),
+                "senders": {str(port_): stats.snapshot(uptime) for port_, stats in self.senders.items() if port is None or port_ == port},
+                "recipients": {str(port_): stats.snapshot(uptime) for port_, stats in self.recipients.items() if port is None or port_ == port},
+            }
+
+class _SharedPorts:
+    """Set of ports stored as one byte per port in shared memory (clients_framed of a sharded switch)."""
+
+    def __init__(self, ports=()) -> None:
+        self._slots = multiprocessing.RawArray("B", _PORT_SLOTS)
+        for port in ports: self.add(port)
+
+    def __contains__(self, port: int) -> bool:
+        return bool(self._slots[port])
+
+    def __iter__(self) -> Iterator[int]:
+        return iter([match.start() for match in re.finditer(rb"[^\x00]", bytes(self._slots))])
+
+    def __len__(self) -> int:
+        return _PORT_SLOTS - bytes(self._slots).count(0)
+
+    def add(self, port: int) -> None:
+        self._slots[port] = 1
+
+    def discard(self, port: int) -> None:
+        self._slots[port] = 0
+
+class _SharedRegistry:
+    """
+    Port:Address registry of a sharded switch in shared memory (one IPv4 slot per port), so that a client registered
+    through one worker process can be reached through all the others. Used like the clients_data dict.
+    Transport addresses ('unix:DIRECTORY') must be known when it is created and are stored as index of names.
+    """
+
+    def __init__(self, clients_data: dict = None, names: list[str] = ()) -> None:
+        self._ports = _SharedPorts() #Registered ports (scanned by keys())
+        self._named = _SharedPorts() #Ports with a transport address instead of an IPv4 address
+        self._addresses = multiprocessing.RawArray("I", _PORT_SLOTS) #IPv4 address or index of the name
+        self._names: tuple = tuple(dict.fromkeys(names))
+        for port, address in (clients_data or {}).items(): self[port] = address
+
+    def __contains__(self, port: int) -> bool:
+        return port in self._ports
+
+    def __getitem__(self, port: int) -> str:
+        if port not in self._ports: raise KeyError(port)
+        if port in self._named: return self._names[self._addresses[port]]
+        return socket.inet_ntoa(self._addresses[port].to_bytes(4, "big"))
+
+    def __setitem__(self, port: int, address: str) -> None:
+        if address in self._names:
+            self._addresses[port] = self._names.index(address)
+            self._named.add(port)
+        else:
+            self._addresses[port] = int.from_bytes(socket.inet_aton(address), "big")
+            self._named.discard(port)
+        self._ports.add(port) #Set last, the address is readable once the port is listed
+
+    def __delitem__(self, port: int) -> None:
+        if port not in self._ports: raise KeyError(port)
+        self._ports.discard(port)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ports)
+
+    def __len__(self) -> int:
+        return len(self._ports)
+
+    def get(self, port: int, default: str = None) -> Union[str, None]:
+        return self[port] if port in self._ports else default
+
+    def keys(self) -> list[int]:
+        return list(self._ports)
+
+    def items(self) -> list[tuple[int, str]]:
+        return [(port, self[port]) for port in self._ports]
+
+class _ShardChannel:
+    """
+    Stands in for the metrics of a worker process of a sharded switch (same record()/snapshot() methods) and carries its log records.
+    Records are sent to the parent process in batches, which keeps the log and the counters of all workers.
+    Before the parent answers a statistics request, every worker flushes its batch, so the counters of all workers are consistent.
+    """
+
+    def __init__(self, connection: multiprocessing.connection.Connection, batch_size: int = 1024) -> None:
+        self.batch_size = batch_size
+        self._connection = connection
+        self._records: list = [] #AlphaLogRecords not yet sent
+        self._metrics: list = [] #AlphaMetrics.record() arguments not yet sent
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._stats_lock = threading.Lock() #One statistics request at a time (answered in order)
+        self._replies: queue.Queue = queue.Queue() #Statistics sent by the parent process
+        threading.Thread(target=self.__receive__, daemon=True).start()
+
+    def append(self, record: AlphaLogRecord) -> None:
+        with self._lock:
+            self._records.append(record)
+            full = len(self._records) >= self.batch_size
+        if full: self.flush()
+
+    def record(self, *metric) -> None:
+        with self._lock:
+            self._metrics.append(metric)
+            full = len(self._metrics) >= self.batch_size
+        if full: self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            records, metrics = self._records, self._metrics
+            self._records, self._metrics = [], []
+        if records or metrics:
+            with self._send_lock: self._connection.send(("batch", records, metrics))
+
+    def snapshot(self, port: int = None) -> dict:
+        """Statistics of all workers (sent by the parent process after every worker flushed its batch)."""
+        with self._stats_lock:
+            self.flush()
+            with self._send_lock: self._connection.send(("stats", port))
+            return self._replies.get(timeout=_SHARD_STATS_TIMEOUT * 2)
+
+    def reset(self) -> None:
+        with self._send_lock: self._connection.send(("reset",))
+
+    def admission(self, counters: dict) -> None:
+        """Queue and rate limit counters of the worker (replaced in the parent process on every call)."""
+        with self._send_lock: self._connection.send(("admission", counters))
+
+    def __receive__(self) -> None:
+        """Answers the flush requests of the parent process and passes its statistics to snapshot()."""
+        while True:
+            try: message = self._connection.recv()
+            except (EOFError, OSError): return #Worker or parent stopped
+            if message[0] == "flush":
+                self.flush()
+                with self._send_lock: self._connection.send(("flushed",))
+            elif message[0] == "stats": self._replies.put(message[1])
+
+class _ShardTrafficLog(AlphaTrafficLog):
+    """Traffic log of a worker process: keeps the newest records of the worker (readable in the callback) and sends every record to the parent process."""
+
+    def __init__(self, channel: _ShardChannel, capacity: int) -> None:
+        super().__init__(capacity)
+        self._channel = channel
+
+    def append(self, record: AlphaLogRecord) -> None:
+        super().append(record)
+        self._channel.append(record)
+
+    def flush(self) -> None:
+        super().flush()
+        self._channel.flush()
+
+class _TokenBucket:
+    """Refills rate tokens per second up to burst, every admitted packet takes one."""
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate, self.burst, self.tokens, self.updated = rate, burst, burst, time.monotonic()
+
+    def ready(self, now: float) -> bool:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens >= 1
+
+class AlphaRateLimiter:
+    """
+    Token bucket rate limits of the switch: packets per second of every sender port (own limits for single ports possible)
+    and of all senders together. A packet is admitted only if every bucket it passes has a token left.
+
+    >>> limiter = AlphaRateLimiter()
+    >>> limiter.setLimit(100.0, burst=20) #Every sender
+    >>> limiter.setGlobalLimit(5000.0)
+    >>> limiter.allow(23456)
+    """
+
+    def __init__(self) -> None:
+        self.limited: int = 0 #Packets that were not admitted
+        self._default: Union[tuple[float, float], None] = None #(rate, burst) of every sender
+        self._limits: dict = {} #Port:(rate, burst) of single senders
+        self._global: Union[_TokenBucket, None] = None
+        self._buckets: dict = {} #Port:_TokenBucket
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._default is not None or bool(self._limits) or self._global is not None
+
+    def setLimit(self, rate: Union[float, None], burst: float = None, port: int = None) -> None:
+        """Limit every sender (or only the port) to rate packets per second with bursts of up to burst packets (Standard: rate). None removes the limit."""
+        limit = None if rate is None else (rate, burst if burst is not None else max(1.0, rate))
+        with self._lock:
+            if port is None:
+                self._default = limit
+                self._buckets.clear()
+            else:
+                if limit is None: self._limits.pop(port, None)
+                else: self._limits[port] = limit
+                self._buckets.pop(port, None)
+
+    def setGlobalLimit(self, rate: Union[float, None], burst: float = None) -> None:
+        """Limit all senders together to rate packets per second with bursts of up to burst packets (Standard: rate). None removes the limit."""
+        with self._lock: self._global = None if rate is None else _TokenBucket(rate, burst if burst is not None else max(1.0, rate))
+
+    def allow(self, port: int) -> bool:
+        """Takes a token of the sender and of the global bucket, False if one of them is empty."""
+        if not self.enabled: return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(port)
+            if bucket is None:
+                limit = self._limits.get(port, self._default)
+                if limit is not None: bucket = self._buckets[port] = _TokenBucket(*limit)
+            if (bucket is not None and not bucket.ready(now)) or (self._global is not None and not self._global.ready(now)):
+                self.limited += 1
+                return False
+            if bucket is not None: bucket.tokens -= 1
+            if self._global is not None: self._global.tokens -= 1
+        return True
+
+class AlphaResponseCache:
+    """
+    Responses of the recipients keyed by (recipient_port, message), evicted after ttl seconds or as least recently used.
+    Responses marked uncacheable are never stored, unmarked ones only if cache_unmarked is set (text clients cannot mark responses).
+    A port is invalidated in O(1) by increasing its generation; entries of older generations are dropped when they are looked up.
+
+    >>> virtual_switch.setResponseCache(max_entries=10000, ttl=5.0)
+    >>> virtual_switch.getCacheStats()
+    {'hits': 120, 'misses': 4, 'hit_rate': 0.96774, 'entries': 4, 'invalidations': 1}
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 5.0, cache_unmarked: bool = False) -> None:
+        self.max_entries, self.ttl, self.cache_unmarked = max_entries, ttl, cache_unmarked
+        self.hits = self.misses = self.invalidations = 0
+        self._entries: OrderedDict = OrderedDict() #(port, message):(response, generation, expires_at)
+        self._generations = [0] * _PORT_SLOTS #Replaced by shared memory in a sharded switch
+        self._lock = threading.Lock()
+
+    def get(self, port: int, message: bytes) -> Union[bytes, None]:
+        key = (port, message)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] != self._generations[port] or entry[2] < time.monotonic():
+                if entry is not None: del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, port: int, message: bytes, response, flags: int = 0) -> None:
+        """Stores the response if its flags (or cache_unmarked) allow it."""
+        if flags & _FLAG_UNCACHEABLE or not (flags & _FLAG_CACHEABLE or self.cache_unmarked): return
+        key = (port, message)
+        with self._lock:
+            self._entries[key] = (bytes(response), self._generations[port], time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries: self._entries.popitem(last=False)
+
+    def invalidate(self, port: int) -> None:
+        """Drops every response of the port (e.g. when it registers again or is removed)."""
+        self._generations[port] += 1 #A lost concurrent increment still changes the generation
+        self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock: self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / lookups, 5) if lookups else 0.0, "entries": len(self._entries), "invalidations": self.invalidations}
+
+class _Packet:
+    """Packet handled by the switch: the parsed request and the state of its response (see AlphaSwitch.__handle_packet__())."""
+    __slots__ = ("started", "framed", "flags", "tag", "header", "payload", "raw_data", "message", "sender_port", "recipient_port", "request_size",
+                 "sender_address", "recipient_address", "recipient_connected", "recipient_framed",
+                 "status", "retries", "response", "response_payload", "response_size", "request_log", "response_log", "entries")
+
+    def __init__(self, started: float) -> None:
+        self.started = started #time.time() when the packet arrived
+        self.framed, self.flags, self.tag = False, 0, None
+        self.header = self.payload = None #Frame header (setZeroCopy() only) and payload
+        self.raw_data = self.message = None #Text packet (sPORT:Message:rPORT), message (decoded for the switch itself only)
+        self.status, self.retries = _STATUS_NOT_FOUND, 0
+        self.response = None #Response in the text format (sPort:Message:rPort)
+        self.response_payload = None #Forwarded or cached response
+        self.response_size = self.request_log = self.response_log = None #Set by handlers that do not fit the defaults of __log_packet__()
+        self.entries = None #[((recipient_port, message), (recipient_port, status, response)), ...] of a batch
+
+class AlphaSwitch:
+    """
+    Virtual-Switch (used to manage data flows)
+
+    Simple setup:
+    >>> virtual_switch = AlphaSwitch()
+    >>> while True:
+    >>>     virtual_switch.handleTraffic()
+
+    Concurrent setup (one persistent listening socket):
+    >>> virtual_switch = AlphaSwitch()
+    >>> virtual_switch.serveForever(callback=print)
+    """
+
+    switch_address: str = None 
+    switch_port: int = 25505
+    _startlog: bool = False
+    _blacklist_count: int  = 2 #How many times a connection can not respond before it is blacklisted
+    _retries: int = 1 #Additional attempts to forward a packet to a recipient that did not respond
+    _forward_timeout: float = None #Seconds the switch waits for the response of a recipient (None = no limit)
+    _backoff: float = 0.5 #Seconds a recipient that did not respond is skipped (doubled on every further failure)
+    _max_backoff: float = 30.0 #Longest time a recipient that did not respond is skipped
+    _byte_size: int = 4096 #Maximum amount of bytes a message can contain
+    _zero_copy: bool = False #Relay frames between framed clients without decoding or copying the payload
+    _log_capacity: int = 10000 #Amount of log records kept in memory
+    _log_preview: int = 256 #Characters of a message kept in log records (None = complete messages)
+    _metrics: bool = True #Record per-port counters and latency histograms
+
+    def __init__(self) -> None:
+        self.transfer_count: int = 0 #Counts the amount of packages handled
+        self.clients_data: dict = {} #Saves the address of every connected port (Port:Address)
+        self.health: AlphaHealthTracker = AlphaHealthTracker() #Circuit breaker for non responding clients
+        self.clients_framed: set = set() #Ports that negotiated the framed protocol
+        self.log: AlphaTrafficLog = AlphaTrafficLog(AlphaSwitch._log_capacity) #Saved logs (ring buffer, formatted when read)
+        self.metrics: AlphaMetrics = AlphaMetrics() #Per-port counters and latency histograms
+        self.response_cache: Union[AlphaResponseCache, None] = None #Cached responses of recipients (setResponseCache())
+        self._hooks: dict = {} #Callbacks for every forwarding phase (phase:[callback, ...])
+
+        self.connection_pool = AlphaConnectionPool() #Keep-alive connections to the registered clients
+
+        self._fanout_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="NewAlpha-fanout") #Parallel broadcast/multicast forwarding
+        self._send_locks = weakref.WeakKeyDictionary() #Serializes responses on connections shared by tagged frames
+        self._buffers = threading.local() #Reusable receive buffers of every worker thread (zero-copy relay)
+        self._lock = threading.Lock() #Guards the shared state while packets are handled concurrently
+        self._server = _ServeLoop(self.__serve_connection__, housekeeping=self.__housekeeping__, reject=self.__reject_connection__) #serveForever() engine
+        self._callback: Callable[[tuple], None] = None #Per-packet callback of serveForever()
+        self._shared_count = None #Package counter in shared memory (sharded switch)
+        self._shard_stop = None #Stops the worker processes of a sharded switch
+        self.listen_addresses: list = [] #Additional addresses served by serveForever() (addListener())
+        self.rate_limiter: AlphaRateLimiter = AlphaRateLimiter() #Admission control per sender (setRateLimit())
+        self._shard_admission: dict = {} #Queue and rate limit counters of every worker process (sharded switch)
+        self._shard_connections: list = [] #Pipes to the worker processes (sharded switch)
+
+    @classmethod
+    def switchSetup(cls, port: int = None, address: str = None) -> None:
+        """Change the address data of the switch."""
+        if port is not None: cls.switch_port = port
+        if address is not None: cls.switch_address = address
+
+    @classmethod
+    def startLog(cls) -> None:
+        """Start recording traffic and enable logging."""
+        cls._startlog = True
+
+    @classmethod
+    def stopLog(cls) -> None:
+        """Stop recording traffic and disable logging."""
+        cls._startlog = False
+
+    @classmethod
+    def setLogPreview(cls, preview: Union[int, None]) -> None:
+        """
+        Change how many characters of every message are kept in logs, callbacks and handleTraffic() returns (None = complete messages).
+        Standard: 256
+        """
+        cls._log_preview = preview
+
+    @classmethod
+    def setToleration(cls, toleration: int) -> None:
+        """
+        Change the number of times a client cannot respond until they are blacklisted.
+        Standard: 2
+        """
+        cls._blacklist_count = toleration
+
+    @classmethod
+    def setRetries(cls, retries: int = 1, timeout: float = None) -> None:
+        """
+        Change the number of additional attempts to forward a packet and the seconds the switch waits for a response (None = no limit).
+        Standard: 1, None
+        """
+        cls._retries, cls._forward_timeout = retries, timeout
+
+    @classmethod
+    def setBackoff(cls, backoff: float = 0.5, max_backoff: float = 30.0) -> None:
+        """
+        Change how long packets to a client that did not respond fail fast with $E5 (doubled on every further failure, with jitter).
+        Standard: 0.5, 30.0
+        """
+        cls._backoff, cls._max_backoff = backoff, max_backoff
+
+    @classmethod
+    def setZeroCopy(cls, enabled: bool) -> None:
+        """
+        Enable/Disable relaying frames between framed clients without decoding the payload.
+        Only the headers are parsed and the payloads are passed through reusable buffers.
+        Logs and handleTraffic() returns then contain the payload size instead of the message.
+        Standard: False
+        """
+        cls._zero_copy = enabled
+
+    @classmethod
+    def setByteSizeSwitch(cls, byte_size: int) -> None:
+        """
+        Change the maximum amount of bytes a message can contain.
+        Standard: 4096
+        """
+        cls._byte_size = byte_size
+
+    def addListener(self, address: str) -> None:
+        """
+        Additionally accept packets on another address with serveForever(), e.g. 'unix:/run/alpha' (AF_UNIX sockets in the directory)
+        or 'local' (clients in this Python process). Clients are reached through the transport they registered over.
+        """
+        if address not in self.listen_addresses: self.listen_addresses.append(address)
+
+    def setConnectionPool(self, max_connections: int = None, idle_time: float = None) -> None:
+        """
+        Change the keep-alive connections the switch holds to every client.
+        Standard: 4 connections per client, closed after 30 seconds without traffic
+        """
+        if max_connections is not None: self.connection_pool.max_connections = max_connections
+        if idle_time is not None: self.connection_pool.idle_time = idle_time
+
+    @classmethod
+    def setMetrics(cls, enabled: bool) -> None:
+        """
+        Enable/Disable recording per-port counters and latency histograms (see getStats()).
+        Standard: True
+        """
+        cls._metrics = enabled
+
+    def setRateLimit(self, rate: Union[float, None], burst: float = None, port: int = None) -> None:
+        """
+        Limit the packets per second every sender port may send (token bucket with bursts of up to burst packets), or only those of the given port.
+        Packets above the limit are answered with $E6 [Overloaded] instead of being forwarded. None removes the limit.
+        The limits apply to every worker process of a sharded switch separately.
+        Standard: no limit
+        """
+        self.rate_limiter.setLimit(rate, burst, port)
+
+    def setGlobalRateLimit(self, rate: Union[float, None], burst: float = None) -> None:
+        """
+        Limit the packets per second of all senders together (see setRateLimit()).
+        Standard: no limit
+        """
+        self.rate_limiter.setGlobalLimit(rate, burst)
+
+    def setQueueLimit(self, max_pending: Union[int, None], overflow: str = "reject") -> None:
+        """
+        Limit the packets of serveForever() waiting for a free worker. If max_pending packets are waiting, the overflow policy decides:
+        'reject' answers the new packet with $E6 [Overloaded], 'drop_oldest' answers the longest waiting packet with it instead,
+        'block' stops accepting packets until a worker is free (further connections are queued by the operating system). None removes the limit.
+        Standard: no limit
+        """
+        if overflow not in _OVERFLOW_POLICIES: raise ValueError(f"Unknown overflow policy {overflow!r}, expected one of {_OVERFLOW_POLICIES}")
+        self._server.max_pending, self._server.overflow = max_pending, overflow
+
+    def getStats(self, port: int = None) -> dict:
+        """
+        Returns packets, bytes, bytes/sec, retries, NoResponse/NotFound/Overloaded counts and p50/p90/p99 latency (sec)
+        for the whole switch and for every sender and recipient port (only the given port if specified).
+        'admission' contains the current and peak amount of packets waiting for a worker and how many overflowed the queue or the rate limits.
+        Clients can request the same data using the '@stats' message (AlphaClient.requestStats()).
+        """
+        if isinstance(self.metrics, _ShardChannel): return self.metrics.snapshot(port) #Collected by the parent process
+        return {**self.metrics.snapshot(port), "admission": self.__admission__()}
+
+    def resetStats(self) -> None:
+        """Clears all recorded counters and latency histograms."""
+        self.metrics.reset()
+        self._server.resetCounters()
+        self.rate_limiter.limited = 0
+
+    def __admission__(self) -> dict:
+        if self._shard_admission: #Sum of the worker processes
+            workers = list(self._shard_admission.values())
+            admission = {key: sum(worker[key] for worker in workers) for key in ("queue_depth", "peak_queue_depth", "overflowed", "rate_limited")}
+            return {**admission, "max_pending": workers[0]["max_pending"], "overflow": workers[0]["overflow"]}
+        return {
+            "queue_depth": self._server.depth, "peak_queue_depth": self._server.peak_depth, "max_pending": self._server.max_pending,
+            "overflow": self._server.overflow, "overflowed": self._server.overflowed, "rate_limited": self.rate_limiter.limited,
+        }
+
+    def addHook(self, phase: str, callback: Callable[[str, int, float], None]) -> None:
+        """
+        Calls callback(phase, port, seconds) after every forwarding phase: 'accept' (waiting for the packet), 'parse' (receiving/parsing
+        the request, sender port), 'connect' (getting a connection to the recipient), 'send' and 'recv' (recipient port).
+        Callbacks run on the worker threads and should return quickly.
+        """
+        if phase not in _HOOK_PHASES: raise ValueError(f"Unknown phase {phase!r}, expected one of {_HOOK_PHASES}")
+        with self._lock: self._hooks = {**self._hooks, phase: self._hooks.get(phase, []) + [callback]} #Replaced, never mutated (read without lock)
+
+    def removeHook(self, phase: str, callback: Callable[[str, int, float], None]) -> None:
+        """Removes a callback added with addHook()."""
+        with self._lock: self._hooks = {**self._hooks, phase: [hook for hook in self._hooks.get(phase, []) if hook != callback]}
+
+    def __hook__(self, phase: str, port: Union[int, None], started: float) -> None:
+        for callback in self._hooks.get(phase, ()): callback(phase, port, time.perf_counter() - started)
+
+    def setResponseCache(self, enabled: bool = True, max_entries: int = 10000, ttl: float = 5.0, cache_unmarked: bool = False) -> None:
+        """
+        Enable/Disable answering repeated requests from a cache instead of forwarding them (keyed by recipient port and message).
+        Only responses marked as cacheable by the responder (AlphaReply, frozenResponse(cacheable=True)) are cached, unless cache_unmarked is set.
+        Standard: disabled
+        """
+        self.response_cache = AlphaResponseCache(max_entries, ttl, cache_unmarked) if enabled else None
+
+    def getCacheStats(self) -> Union[dict, None]:
+        """Returns the hits, misses, hit rate, entries and invalidations of the response cache (None if it is disabled)."""
+        return None if self.response_cache is None else self.response_cache.stats()
+
+    def __invalidate__(self, port: int) -> None:
+        if self.response_cache is not None: self.response_cache.invalidate(port)
+
+    def setLogCapacity(self, capacity: int) -> None:
+        """
+        Change the amount of logs kept in memory (the oldest logs are dropped first).
+        Standard: 10000
+        """
+        self.log.setCapacity(capacity)
+
+    def setLogFile(self, path: Union[str, None], max_bytes: int = 10_000_000, backups: int = 3) -> None:
+        """
+        Additionally write every log to a binary file, rotated after max_bytes (path.1, path.2, ...). None stops writing.
+        Read it again using AlphaTrafficLog.replay(path, port, since, until).
+        """
+        self.log.spill(path, max_bytes, backups)
+
+    def queryLog(self, port: int = None, since: float = None, until: float = None) -> list[AlphaLogRecord]:
+        """Returns the logs in memory sent from/to the port within the time range (time.time() values)."""
+        return self.log.query(port, since, until)
+
+    @property
+    def getNewestLog(self) -> str:
+        """Returns the newest recorded log."""
+        return str(self.log[-1])
+    
+    @property
+    def getFullLog(self) -> list:
+        """Returns the entire logging history (kept in memory)."""
+        return list(self.log)
+
+    def handleTraffic(self) -> tuple[str, str, int, str, str, float]:
+        """
+        Handles/Manages all data flow from clients.
+        Return order: (response, sender_address, sender_port, decoded_data, date_time, package_respond_time (in sec))
+        """
+        if AlphaSwitch.switch_address is None: raise MissingAddressSetup 
+
+        port_socket = self.__listen__([AlphaSwitch.switch_address], 1)[0]
+        switch_socket, address = port_socket.accept()
+        try: 
+            packet = self.__handle_packet__(switch_socket, address)
+            return None if packet is None else self.__packet_tuple__(*packet)
+        finally:
+            switch_socket.close()
+            port_socket.close()
+
+    def serveForever(self, callback: Callable[[tuple], None] = None, workers: int = 8, backlog: int = 128, processes: int = 1) -> None:
+        """
+        Keeps one listening socket open and handles packets concurrently until shutdown() is called.
+        Every handled packet is passed to the callback in the same order as the handleTraffic() return.
+
+        With processes > 1 the switch is sharded: every worker process accepts on the switch port (SO_REUSEPORT, Unix only),
+        the registry and the health state are shared, and the log and the counters of all workers are collected in this
+        process about once a second. The callback then runs in the worker processes, where getNewestLog, getFullLog and queryLog()
+        return the records of that worker. Configure the switch before calling it.
+
+        >>> virtual_switch.serveForever(callback=lambda packet: print(virtual_switch.getNewestLog))
+        """
+        if AlphaSwitch.switch_address is None: raise MissingAddressSetup
+        if processes > 1: return self.__serve_sharded__(callback, workers, backlog, processes)
+
+        port_sockets = self.__listen__([AlphaSwitch.switch_address, *self.listen_addresses], backlog)
+        self._callback = callback
+        try: self._server.serve(port_sockets, workers)
+        finally: 
+            self.connection_pool.closeAll()
+            self.log.flush()
+
+    def shutdown(self) -> None:
+        """Stops serveForever() after the packets currently in flight have been handled."""
+        self._server.stop()
+        if self._shard_stop is not None: self._shard_stop.set()
+
+    @staticmethod
+    def __listen__(addresses: list[str], backlog: int, reuse_port: bool = False) -> list[socket.socket]:
+        port_sockets = []
+        try:
+            for address in addresses: port_sockets.append(_transport(address).listen(address, AlphaSwitch.switch_port, backlog, reuse_port))
+        except BaseException:
+            for port_socket in port_sockets: port_socket.close()
+            raise
+        return port_sockets
+
+    def __serve_sharded__(self, callback: Callable[[tuple], None], workers: int, backlog: int, processes: int) -> None:
+        if not hasattr(socket, "SO_REUSEPORT") or "fork" not in multiprocessing.get_all_start_methods(): 
+            raise OSError("A sharded switch requires SO_REUSEPORT and fork (Unix)")
+        addresses = [AlphaSwitch.switch_address, *self.listen_addresses]
+        if any(isinstance(_transport(address), AlphaLocalTransport) for address in addresses): raise OSError("The in-process transport can not be sharded")
+        tcp_addresses = [address for address in addresses if _transport(address) is _TCP_TRANSPORT] #Bound by every worker
+        inherited = self.__listen__([address for address in addresses if _transport(address) is not _TCP_TRANSPORT], backlog) #Bound once, accepted by every worker
+        with self._lock: #Shared memory is inherited by the forked workers
+            if not isinstance(self.clients_data, _SharedRegistry):
+                names = [address for address in (*addresses, *self.clients_data.values()) if _transport(address) is not _TCP_TRANSPORT]
+                self.clients_data, self.clients_framed = _SharedRegistry(self.clients_data, names), _SharedPorts(self.clients_framed)
+                self.health = _SharedHealthTracker(self.health)
+                if self.response_cache is not None: self.response_cache._generations = multiprocessing.RawArray("I", self.response_cache._generations) #Invalidations reach every worker
+                self._shared_count = multiprocessing.Value("Q", self.transfer_count)
+
+        context = multiprocessing.get_context("fork")
+        self._shard_stop = context.Event()
+        connections, shards = [], []
+        self._shard_connections = connections
+        for _ in range(processes):
+            connection, shard_connection = context.Pipe()
+            shard = context.Process(target=self.__serve_shard__, args=(callback, workers, backlog, tcp_addresses, inherited, shard_connection), daemon=True)
+            shard.start()
+            shard_connection.close()
+            connections.append(connection)
+            shards.append(shard)
+
+        try:
+            while connections: #Collect the logs and counters of the workers until all of them stopped
+                for connection in multiprocessing.connection.wait(connections, timeout=1.0):
+                    try: self.__shard_message__(connection, connection.recv())
+                    except (EOFError, OSError): connections.remove(connection)
+                self.log.flush()
+        finally:
+            self._shard_stop.set()
+            for shard in shards: shard.join()
+            for port_socket in inherited: port_socket.close()
+            self._shard_stop = None
+            self.transfer_count = self._shared_count.value
+            self.log.flush()
+
+    def __serve_shard__(self, callback: Callable[[tuple], None], workers: int, backlog: int, tcp_addresses: list[str], inherited: list[socket.socket],
+                        connection: multiprocessing.connection.Connection) -> None:
+        #Threads, locks and sockets of the parent are not usable after fork
+        self._lock = threading.Lock()
+        self._send_locks = weakref.WeakKeyDictionary()
+        self._buffers = threading.local()
+        self._fanout_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="NewAlpha-fanout")
+        self.connection_pool = AlphaConnectionPool(self.connection_pool.max_connections, self.connection_pool.idle_time, self.connection_pool.timeout)
+        server = self._server
+        self._server = _ServeLoop(self.__serve_connection__, housekeeping=self.__housekeeping__, reject=self.__reject_connection__)
+        self._server.max_pending, self._server.overflow = server.max_pending, server.overflow
+        self.rate_limiter._lock = threading.Lock() #Buckets are kept per worker process
+        self.metrics = _ShardChannel(connection)
+        self.log = _ShardTrafficLog(self.metrics, self.log.capacity)
+
+        port_sockets = self.__listen__(tcp_addresses, backlog, reuse_port=True) + inherited
+        threading.Thread(target=lambda: (self._shard_stop.wait(), self._server.stop()), daemon=True).start()
+        self._callback = callback
+        try: self._server.serve(port_sockets, workers)
+        finally:
+            self.connection_pool.closeAll()
+            self.log.flush()
+            connection.close()
+
+    def __shard_message__(self, connection: multiprocessing.connection.Connection, message: tuple) -> None:
+        if message[0] == "batch":
+            for record in message[1]: self.log.append(record)
+            for metric in message[2]: self.metrics.record(*metric)
+            self.transfer_count = self._shared_count.value
+        elif message[0] == "stats": #The requesting worker flushed already
+            self.__flush_shards__(connection)
+            connection.send(("stats", self.getStats(message[1])))
+        elif message[0] == "reset": self.metrics.reset()
+        elif message[0] == "admission": self._shard_admission[id(connection)] = message[1]
+
+    def __flush_shards__(self, requester: multiprocessing.connection.Connection) -> None:
+        """Lets every other worker flush its batch and collects the batches (at most _SHARD_STATS_TIMEOUT seconds)."""
+        waiting = []
+        for connection in self._shard_connections:
+            if connection is requester: continue
+            try: connection.send(("flush",))
+            except OSError: continue #Worker stopped
+            waiting.append(connection)
+        deadline, deferred = time.monotonic() + _SHARD_STATS_TIMEOUT, []
+        while waiting and time.monotonic() < deadline:
+            for connection in multiprocessing.connection.wait(waiting, timeout=max(0.0, deadline - time.monotonic())):
+                try: message = connection.recv()
+                except (EOFError, OSError): message = ("flushed",)
+                if message[0] == "flushed": waiting.remove(connection)
+                elif message[0] == "stats": deferred.append((connection, message)) #Requested by another worker meanwhile (flushed already)
+                else: self.__shard_message__(connection, message)
+        for connection, message in deferred: connection.send(("stats", self.getStats(message[1])))
+
+    def __housekeeping__(self) -> None:
+        self.connection_pool.evictIdle()
+        self.log.flush()
+        if isinstance(self.metrics, _ShardChannel): self.metrics.admission(self.__admission__())
+
+    def __reject_connection__(self, switch_socket: socket.socket, address: tuple, detach: Callable[[], None]) -> None:
+        """
+        Answers a packet that overflowed the pending queue with $E6 [Overloaded], the connection is closed afterwards.
+        Runs in the selector thread, so only the header is read (within _REJECT_TIMEOUT in total) and the payload never is.
+        """
+        start_handle_time, deadline = time.time(), time.monotonic() + _REJECT_TIMEOUT
+        first_byte = _recv_within(switch_socket, 1, deadline)
+        tag = None
+        if first_byte[0] == _FRAME_MAGIC:
+            flags, sender_port, recipient_port, request_size = _parse_header(first_byte + _recv_within(switch_socket, _FRAME_HEADER.size - 1, deadline))
+            if flags & _FLAG_TAGGED: tag = bytes(_recv_within(switch_socket, _TAG.size, deadline)) #Echoed, the client matches responses by it
+            self.__reply_frame__(switch_socket, AlphaSwitch.switch_port, sender_port, _OVERLOADED_MESSAGE.encode(), _FLAG_STATUS, tag)
+        else: #Text packet (sPORT:Message:rPORT), the recipient port comes last and stays unread
+            sender_port, recipient_port, request_size = int((first_byte + _recv_within(switch_socket, 4, deadline)).decode()), AlphaSwitch.switch_port, 0
+            switch_socket.sendall(f"{AlphaSwitch.switch_port}:{_OVERLOADED_MESSAGE}:{sender_port}".encode())
+
+        describe = AlphaSwitch._startlog or self._callback is not None
+        response = f"{AlphaSwitch.switch_port}:{_OVERLOADED_MESSAGE}:{sender_port}"
+        record = self.__record__(start_handle_time, sender_port, recipient_port, request_size, len(response), _STATUS_REJECTED,
+                                 f"{sender_port}:<not received>:{recipient_port}" if describe else "", _preview(response, AlphaSwitch._log_preview) if describe else "")
+        if AlphaSwitch._metrics: self.metrics.record(sender_port, recipient_port, request_size, len(response), record.latency, _STATUS_REJECTED, 0)
+        if self._callback is not None:
+            with self._lock: sender_address = self.clients_data.get(sender_port)
+            self._callback(self.__packet_tuple__(record, sender_address))
+
+    def __record__(self, start_handle_time: float, sender_port: int, recipient_port: int, request_size: int, response_size: int, status: int,
+                   request: str, response: str) -> AlphaLogRecord:
+        """Numbers a handled packet (uniquely across the worker processes of a sharded switch) and records it in the traffic log."""
+        end_time = time.time()
+        if self._shared_count is None:
+            with self._lock:
+                self.transfer_count += 1
+                number = self.transfer_count
+        else:
+            with self._shared_count.get_lock():
+                self._shared_count.value += 1
+                number = self.transfer_count = self._shared_count.value
+        record = AlphaLogRecord(number, end_time, sender_port, recipient_port, request_size, response_size, end_time - start_handle_time, status, request, response)
+        if AlphaSwitch._startlog: self.log.append(record) #Record log (formatted when it is read)
+        return record
+
+    def __serve_connection__(self, switch_socket: socket.socket, address: tuple, detach: Callable[[], None]) -> bool:
+        packet = self.__handle_packet__(switch_socket, address, detach, AlphaSwitch._startlog or self._callback is not None)
+        if packet is None: return False
+        if self._callback is not None: self._callback(self.__packet_tuple__(*packet))
+        return True
+
+    @staticmethod
+    def __packet_tuple__(record: AlphaLogRecord, sender_address: str) -> tuple[str, str, int, str, str, float]:
+        """Return order of handleTraffic(): (response, sender_address, sender_port, decoded_data, date_time, package_respond_time (in sec))"""
+        date_string = datetime.fromtimestamp(record.timestamp).strftime("%d/%m/%Y %H:%M:%S")
+        return (record.response, sender_address, record.sender_port, record.request, date_string, round(record.latency, 5))
+
+    def __buffer__(self, slot: int, size: int) -> memoryview:
+        """
+        Reusable buffer of the current worker thread (slot 0/1: request header/payload, 2/3: response header/payload).
+        Buffers grow up to the byte size (at least _RELAY_BUFFER), larger payloads get a temporary buffer that is freed after the packet.
+        """
+        limit = max(AlphaSwitch._byte_size, _RELAY_BUFFER)
+        if size > limit: return memoryview(bytearray(size))
+        buffers = getattr(self._buffers, "slots", None)
+        if buffers is None: buffers = self._buffers.slots = [bytearray(_FRAME_HEADER.size), bytearray(AlphaSwitch._byte_size), bytearray(_FRAME_HEADER.size), bytearray(AlphaSwitch._byte_size)]
+        if len(buffers[slot]) < size: buffers[slot] = bytearray(min(max(size, 2 * len(buffers[slot])), limit))
+        return memoryview(buffers[slot])[:size]
+
+    def __forward__(self, address: str, port: int, data: Union[bytes, tuple], framed: bool = False, timeout: float = None) -> tuple[int, Union[bytes, memoryview]]:
+        """
+        Sends the packet to the recipient over a pooled keep-alive connection and returns the response flags and message.
+        A tuple of buffers (header, payload) is relayed without copying and the response is received into reusable buffers.
+        A connection that times out is closed, since the late response would otherwise be read by the next packet.
+        """
+        hooks = self._hooks
+        while True:
+            started = time.perf_counter()
+            client_socket, reused = self.connection_pool.acquire(address, port)
+            if hooks: self.__hook__("connect", port, started)
+            try:
+                if timeout is not None: client_socket.settimeout(timeout)
+                started = time.perf_counter()
+                if isinstance(data, tuple): _send_parts(client_socket, *data)
+                else: client_socket.sendall(data)
+                if hooks: self.__hook__("send", port, started)
+
+                started, response_flags = time.perf_counter(), 0
+                if isinstance(data, tuple): 
+                    response_header = self.__buffer__(2, _FRAME_HEADER.size)
+                    _recv_into(client_socket, response_header)
+                    response_flags, _, _, response_length = _parse_header(response_header)
+                    response = self.__buffer__(3, response_length)
+                    _recv_into(client_socket, response)
+                elif framed: response_flags, _, _, response = _recv_frame(client_socket)
+                else: response = client_socket.recv(AlphaSwitch._byte_size)
+                if hooks: self.__hook__("recv", port, started)
+                if not response and not framed: raise ConnectionResetError #Recipient closed the kept-alive connection
+            except OSError:
+                self.connection_pool.release(address, port, client_socket, reusable=False)
+                if reused: continue #Stale connection, retry with another one
+                raise
+            if timeout is not None: client_socket.settimeout(self.connection_pool.timeout)
+            self.connection_pool.release(address, port, client_socket)
+            return (response_flags, response)
+
+    def __reply_frame__(self, switch_socket: socket.socket, sender_port: int, recipient_port: int, payload, flags: int, tag: Union[bytes, None]) -> None:
+        """
+        Sends a response frame. Only the header is built, the payload is sent from its buffer.
+        Tagged responses echo the correlation ID and may share the connection with other workers.
+        """
+        if tag is None:
+            _send_parts(switch_socket, _FRAME_HEADER.pack(_FRAME_MAGIC, _FRAME_VERSION, flags, sender_port, recipient_port, len(payload)), payload)
+            return
+        with self._lock: send_lock = self._send_locks.setdefault(switch_socket, threading.Lock())
+        with send_lock: _send_parts(switch_socket, _FRAME_HEADER.pack(_FRAME_MAGIC, _FRAME_VERSION, flags | _FLAG_TAGGED, sender_port, recipient_port, _TAG.size + len(payload)), tag, payload)
+
+    def __fan_out__(self, sender_port: int, ports: Union[list[int], None], message: bytes, timeout: float) -> list[tuple[int, int, bytes]]:
+        """
+        Forwards the message to every port (None = every client except the sender) in parallel.
+        Responses that did not arrive before the deadline are reported with their status.
+        Return: [(recipient_port, status, response_data), ...]
+        """
+        with self._lock:
+            if ports is None: ports = [port for port in self.clients_data.keys() if port != sender_port]
+            recipients = [(port, self.clients_data.get(port), port in self.clients_framed) for port in ports]
+
+        futures = {}
+        for port, address, framed in recipients:
+            if address is None or not self.health.allow(port): continue #Not connected to the network or not responding
+            if framed: data = _pack_frame(sender_port, port, message)
+            else: data = f"{sender_port}:{message.decode(errors='replace')}:{port}".encode()
+            futures[port] = self._fanout_pool.submit(self.__forward__, address, port, data, framed, timeout)
+            futures[port].add_done_callback(lambda future, port=port: self.__health__(port, future.exception() is None))
+        wait(futures.values(), timeout=timeout)
+
+        results = []
+        for port, _, _ in recipients:
+            future = futures.get(port)
+            if future is None: results.append((port, _CAST_FAILED, b""))
+            elif not future.done(): results.append((port, _CAST_TIMEOUT, b""))
+            elif future.exception() is not None: results.append((port, _CAST_TIMEOUT if isinstance(future.exception(), TimeoutError) else _CAST_FAILED, b""))
+            else: results.append((port, _CAST_OK, bytes(future.result()[1])))
+        return results
+
+    def __health__(self, port: int, responded: bool) -> int:
+        """Updates the circuit breaker of the port. Return: consecutive failures"""
+        if responded: 
+            self.health.success(port)
+            return 0
+        return self.health.failure(port, AlphaSwitch._backoff, AlphaSwitch._max_backoff)
+
+    def __failed__(self, port: int) -> None:
+        """Opens the circuit of a recipient that did not respond and removes the port after _blacklist_count failures in a row."""
+        if self.__health__(port, False) < AlphaSwitch._blacklist_count: return
+        with self._lock:
+            if port in self.clients_data: 
+                del self.clients_data[port] #remove the port from connections if port isn't responding repeatedly
+                self.clients_framed.discard(port)
+                self.connection_pool.discard(port)
+                self.__invalidate__(port)
+
+    def __batch__(self, sender_port: int, entries: list[tuple[int, bytes]]) -> list[tuple[int, int, bytes]]:
+        """
+        Groups the requests of a batch by recipient, forwards every group in one exchange (groups in parallel)
+        and returns the results in the original order.
+        Return: [(recipient_port, status, response_data), ...]
+        """
+        groups: dict = {} #Port:[index, ...]
+        for index, (port, _) in enumerate(entries): groups.setdefault(port, []).append(index)
+        forward = lambda port, indexes: self.__forward_group__(sender_port, port, [entries[index][1] for index in indexes])
+        if len(groups) == 1: group_results = [forward(*next(iter(groups.items())))]
+        else: group_results = [future.result() for future in [self._fanout_pool.submit(forward, port, indexes) for port, indexes in groups.items()]]
+
+        results = [None] * len(entries)
+        for (port, indexes), group_result in zip(groups.items(), group_results):
+            for index, (status, data) in zip(indexes, group_result): results[index] = (port, status, data)
+        return results
+
+    def __forward_group__(self, sender_port: int, port: int, messages: list[bytes]) -> list[tuple[int, bytes]]:
+        """
+        Forwards the requests of one recipient (one batch frame, or one by one to text clients).
+        Return: [(status, response_data), ...]
+        """
+        with self._lock: address, framed = self.clients_data.get(port), port in self.clients_framed
+        if address is None or port == AlphaSwitch.switch_port: return [(_STATUS_NOT_FOUND, _NOT_FOUND_MESSAGE.encode())] * len(messages)
+
+        results = [None] * len(messages)
+        if self.response_cache is not None: #Cached responses do not need the circuit (and must not take its probe)
+            for index, message in enumerate(messages):
+                response = self.response_cache.get(port, message)
+                if response is not None: results[index] = (_STATUS_CACHED, response)
+        pending = [index for index, result in enumerate(results) if result is None]
+        if pending and not self.health.allow(port):
+            for index in pending: results[index] = (_STATUS_NO_RESPONSE, _CIRCUIT_OPEN_MESSAGE.encode())
+            return results
+
+        def delivered(index: int, response_flags: int, response: bytes) -> None:
+            results[index] = (_STATUS_FORWARDED, bytes(response)) #Copied before the next exchange reuses the receive buffer
+            if self.response_cache is not None: self.response_cache.put(port, messages[index], response, response_flags)
+
+        retries = 0
+        while pending and retries <= AlphaSwitch._retries:
+            try:
+                if framed:
+                    batch_frame = _pack_frame(sender_port, port, _pack_records([(0, messages[index]) for index in pending], _BATCH_ENTRY), _FLAG_BATCH)
+                    response_flags, response = self.__forward__(address, port, batch_frame, True, AlphaSwitch._forward_timeout)
+                    responses = _unpack_records(response, _BATCH_ENTRY) #[(flags, response), ...]
+                    if not response_flags & _FLAG_BATCH or len(responses) != len(pending): raise ValueError("Malformed batch response")
+                    for index, (response_flags, response) in zip(pending, responses): delivered(index, response_flags, response)
+                    pending = []
+                else: #One exchange per request, a failing request does not resend the delivered ones
+                    while pending:
+                        delivered(pending[0], *self.__forward__(address, port, f"{sender_port}:{messages[pending[0]].decode(errors='replace')}:{port}".encode(), False, AlphaSwitch._forward_timeout))
+                        pending.pop(0)
+            except Exception: 
+                retries+=1
+                continue
+            self.__health__(port, True)
+
+        if pending:
+            self.__failed__(port)
+            for index in pending: results[index] = (_STATUS_NO_RESPONSE, _NO_RESPONSE_MESSAGE.encode())
+        return results
+
+    def __relay_stream__(self, switch_socket: socket.socket, sender_port: int, recipient_port: int, address: str, offer: bytes) -> tuple[int, int, int, str]:
+        """
+        Relays a stream from the sender to the recipient and the response (one frame or a stream) back, frame by frame through a buffer
+        of _RELAY_BUFFER bytes, so streams of any size need bounded memory. The compression is negotiated between the clients.
+        Return order: (status, request_size, response_size, response)
+        """
+        timeout = AlphaSwitch._forward_timeout
+        while True: #Open the stream, a stale kept-alive connection is replaced once
+            client_socket, reused = self.connection_pool.acquire(address, recipient_port)
+            try:
+                if timeout is not None: client_socket.settimeout(timeout)
+                client_socket.sendall(_pack_frame(sender_port, recipient_port, offer, _FLAG_STREAM))
+                accept_flags, _, _, accept = _recv_frame(client_socket)
+                self.__health__(recipient_port, True) #The recipient answered the probe
+                break
+            except OSError:
+                self.connection_pool.release(address, recipient_port, client_socket, reusable=False)
+                if reused: continue
+                self.__failed__(recipient_port)
+                return (_STATUS_NO_RESPONSE, len(offer), 0, f"{AlphaSwitch.switch_port}:{_NO_RESPONSE_MESSAGE}:{sender_port}")
+
+        try:
+            switch_socket.sendall(_pack_frame(recipient_port, sender_port, accept, accept_flags))
+            request_size = len(offer) + self.__pipe_frames__(switch_socket, client_socket, True)
+            response_size = self.__pipe_frames__(client_socket, switch_socket, False)
+        except BaseException: #Both connections are out of sync now
+            self.connection_pool.release(address, recipient_port, client_socket, reusable=False)
+            raise
+        if timeout is not None: client_socket.settimeout(self.connection_pool.timeout)
+        self.connection_pool.release(address, recipient_port, client_socket)
+        return (_STATUS_FORWARDED, request_size, response_size, f"{recipient_port}:<stream of {response_size} bytes>:{sender_port}")
+
+    def __pipe_frames__(self, source: socket.socket, target: socket.socket, request: bool) -> int:
+        """Relays stream frames until the end chunk (a response may also be one plain frame) and returns the relayed payload bytes."""
+        header, buffer, size = self.__buffer__(0, _FRAME_HEADER.size), self.__buffer__(1, _RELAY_BUFFER), 0
+        while True:
+            _recv_into(source, header)
+            flags, _, _, length = _parse_header(header)
+            if request and not flags & _FLAG_STREAM: raise ValueError("Stream interrupted by a plain frame")
+            target.sendall(header)
+            kind, remaining = None, length
+            while remaining:
+                piece = buffer[:min(remaining, _RELAY_BUFFER)]
+                _recv_into(source, piece)
+                if kind is None: kind = piece[0]
+                target.sendall(piece)
+                remaining -= len(piece)
+            size += length
+            if not flags & _FLAG_STREAM or kind == _STREAM_END: return size
+
+    def __handle_packet__(self, switch_socket: socket.socket, address: tuple, detach: Callable[[], None] = None,
+                          describe: bool = True) -> Union[tuple[AlphaLogRecord, str], None]:
+        """
+        Handles one packet and returns its log record and the sender address.
+        The packet is answered by the handler of its kind, every handler sends its own reply in the format of the request.
+        Messages are only decoded if the switch needs them, the log texts only if describe is set (logging, callback, handleTraffic()).
+        """
+        packet = self.__read_packet__(switch_socket, address, detach)
+        if packet is None: return None #Connection closed by the sender
+
+        control = packet.recipient_port == AlphaSwitch.switch_port and not packet.flags & _FLAG_STREAM #Message to the switch itself
+        if not self.rate_limiter.allow(packet.sender_port): self.__reject_packet__(switch_socket, packet) #Admission control, answered with $E6 without forwarding
+        elif packet.flags & _FLAG_STREAM and not (packet.flags & _FLAG_BATCH and packet.recipient_port == AlphaSwitch.switch_port): self.__stream_packet__(switch_socket, packet)
+        elif control and packet.flags & _FLAG_BATCH: self.__batch_packet__(switch_socket, packet)
+        elif control and packet.message.startswith(("@broadcast ", "@multicast ")): self.__cast_packet__(switch_socket, packet)
+        elif control: self.__control_packet__(switch_socket, packet)
+        else: self.__forward_packet__(switch_socket, packet)
+        return (self.__log_packet__(packet, describe), packet.sender_address)
+
+    def __read_packet__(self, switch_socket: socket.socket, address: tuple, detach: Union[Callable[[], None], None]) -> Union[_Packet, None]:
+        """
+        Receives one packet and registers its sender (None if the sender closed the connection).
+        With setZeroCopy() the payload of a frame stays in a reusable buffer. Frames are only decoded if they are sent to the switch itself.
+        """
+        hooks, started = self._hooks, time.perf_counter()
+        packet = _Packet(time.time())
+        first_byte = switch_socket.recv(1, socket.MSG_PEEK)
+        if not first_byte: return None
+        if hooks: self.__hook__("accept", None, started)
+        started = time.perf_counter()
+
+        packet.framed = first_byte[0] == _FRAME_MAGIC
+        if packet.framed and AlphaSwitch._zero_copy: #Parse the header only, the payload stays in a reusable buffer
+            header = packet.header = self.__buffer__(0, _FRAME_HEADER.size)
+            _recv_into(switch_socket, header)
+            flags, sender_port, recipient_port, length = _parse_header(header)
+            payload = self.__buffer__(1, length)
+            _recv_into(switch_socket, payload)
+            if flags & _FLAG_TAGGED: #Strip the correlation ID, the recipient gets a plain frame
+                packet.tag, payload = bytes(payload[:_TAG.size]), payload[_TAG.size:]
+                _FRAME_HEADER.pack_into(header, 0, _FRAME_MAGIC, _FRAME_VERSION, flags & ~_FLAG_TAGGED, sender_port, recipient_port, len(payload))
+        elif packet.framed: #Binary frame (header + payload of any size)
+            flags, sender_port, recipient_port, payload = _recv_frame(switch_socket)
+            if flags & _FLAG_TAGGED: packet.tag, payload = bytes(payload[:_TAG.size]), memoryview(payload)[_TAG.size:]
+        else:
+            packet.raw_data = switch_socket.recv(AlphaSwitch._byte_size)
+            raw_text = str(packet.raw_data.decode()) #Raw data (sPORT:Message:rPORT)
+            flags, sender_port, recipient_port, payload = 0, int(raw_text[:5]), int(raw_text[-5:]), None
+            packet.message = raw_text[6:-6]
+        if packet.framed and recipient_port == AlphaSwitch.switch_port and not flags & (_FLAG_BATCH | _FLAG_STREAM): packet.message = str(payload, "utf-8", "replace")
+        packet.flags, packet.sender_port, packet.recipient_port, packet.payload = flags, sender_port, recipient_port, payload
+        packet.request_size = len(payload) if packet.framed else len(packet.raw_data)
+        if hooks: self.__hook__("parse", sender_port, started)
+        if packet.tag is not None and detach is not None: detach() #Tagged frames of the same connection are handled concurrently
+
+        with self._lock:
+            if sender_port not in self.clients_data: 
+                self.clients_data[int(sender_port)] = str(address[0]) #Add address for the port (Port:Address)
+                self.health.discard(sender_port) #A (re-)registered port starts with a closed circuit
+                self.__invalidate__(sender_port)
+            if packet.framed: self.clients_framed.add(sender_port) #Senders of frames understand frames as recipients too
+            packet.recipient_connected = int(recipient_port) in self.clients_data
+            packet.sender_address = self.clients_data[sender_port] if packet.recipient_connected else None
+            packet.recipient_address = self.clients_data.get(recipient_port)
+            packet.recipient_framed = recipient_port in self.clients_framed
+        return packet
+
+    def __reply_status__(self, switch_socket: socket.socket, packet: _Packet, message: str) -> None:
+        """Answers with a message of the switch ($R1, $E4, $E5, $E6, port list, statistics) in the format of the request."""
+        packet.response = f"{AlphaSwitch.switch_port}:{message}:{packet.sender_port}"
+        try:
+            if packet.framed: self.__reply_frame__(switch_socket, AlphaSwitch.switch_port, packet.sender_port, message.encode(), _FLAG_STATUS, packet.tag)
+            else: switch_socket.sendall(packet.response.encode())
+        except ConnectionResetError: pass
+
+    def __reject_packet__(self, switch_socket: socket.socket, packet: _Packet) -> None:
+        """Packet above the rate limit of its sender (or the global one)."""
+        packet.status = _STATUS_REJECTED
+        if packet.flags & (_FLAG_BATCH | _FLAG_STREAM): packet.request_log = f"{packet.sender_port}:<{packet.request_size} bytes>:{packet.recipient_port}"
+        self.__reply_status__(switch_socket, packet, _RATE_LIMITED_MESSAGE)
+
+    def __stream_packet__(self, switch_socket: socket.socket, packet: _Packet) -> None:
+        """AlphaClient.requestStream(), relayed chunk by chunk in both directions by __relay_stream__() (text clients can not receive streams)."""
+        sender_port, recipient_port = packet.sender_port, packet.recipient_port
+        packet.request_log = f"{sender_port}:<stream>:{recipient_port}"
+        if not packet.recipient_connected: self.__reply_status__(switch_socket, packet, _NOT_FOUND_MESSAGE)
+        elif not packet.recipient_framed: self.__reply_status__(switch_socket, packet, _NO_STREAM_MESSAGE)
+        elif not self.health.allow(recipient_port): #Fail fast while the circuit of the recipient is open
+            packet.status = _STATUS_NO_RESPONSE
+            self.__reply_status__(switch_socket, packet, _CIRCUIT_OPEN_MESSAGE)
+        else:
+            status, packet.request_size, response_size, response = self.__relay_stream__(switch_socket, sender_port, recipient_port, packet.recipient_address, bytes(packet.payload))
+            packet.status = status
+            if status != _STATUS_FORWARDED: self.__reply_status__(switch_socket, packet, _NO_RESPONSE_MESSAGE)
+            else: #Already relayed to the sender
+                packet.response, packet.response_size = response, response_size
+                packet.request_log = f"{sender_port}:<stream of {packet.request_size} bytes>:{recipient_port}"
+
+    def __batch_packet__(self, switch_socket: socket.socket, packet: _Packet) -> None:
+        """AlphaClient.requestBatch(), forwarded grouped by recipient and answered with all responses in one frame."""
+        entries = _unpack_records(packet.payload, _BATCH_REQUEST) #[(recipient_port, message), ...]
+        packet.status = _STATUS_CONTROL
+        packet.request_log = f"{packet.sender_port}:<batch of {len(entries)} requests>:{packet.recipient_port}"
+        results = self.__batch__(packet.sender_port, entries)
+        packet.entries = list(zip(entries, results)) #Counted per entry
+        packet.response = f"{AlphaSwitch.switch_port}:<{len(results)} responses>:{packet.sender_port}"
+        try: self.__reply_frame__(switch_socket, AlphaSwitch.switch_port, packet.sender_port, _pack_records(results, _AGGREGATE_RECORD), _FLAG_AGGREGATE | _FLAG_BATCH, packet.tag)
+        except ConnectionResetError: pass
+
+    def __cast_packet__(self, switch_socket: socket.socket, packet: _Packet) -> None:
+        """AlphaClient.generalRequest()/multicastRequest(), forwarded to the recipients in parallel and answered with the collected responses."""
+        packet.status = _STATUS_CONTROL
+        ports, timeout, message = _parse_cast(bytes(packet.payload) if packet.framed else packet.message.encode())
+        results = self.__fan_out__(packet.sender_port, ports, message, timeout)
+        packet.response = f"{AlphaSwitch.switch_port}:{json.dumps([[port, data.decode(errors='replace') if status == _CAST_OK else None] for port, status, data in results])}:{packet.sender_port}"
+        try:
+            if packet.framed: self.__reply_frame__(switch_socket, AlphaSwitch.switch_port, packet.sender_port, b"".join(_AGGREGATE_RECORD.pack(port, status, len(data)) + data for port, status, data in results), _FLAG_AGGREGATE, packet.tag)
+            else: switch_socket.sendall(packet.response.encode())
+        except ConnectionResetError: pass
+
+    def __control_packet__(self, switch_socket: socket.socket, packet: _Packet) -> None:
+        """Registration (AlphaClient.registerSwitch()), statistics (AlphaClient.requestStats()) and the port list (@all __port__)."""
+        message, sender_port = packet.message, packet.sender_port
+        if message == "@all __port__": #Connected ports without brackets. Example: 25505, 80800, 55420
+            packet.status = _STATUS_CONTROL
+            with self._lock: response = ", ".join(str(port_) for port_ in self.clients_data.keys())
+        elif message == "@stats" or message.startswith("@stats "):
+            packet.status = _STATUS_CONTROL
+            stats_port = message[len("@stats"):].strip()
+            response = json.dumps(self.getStats(int(stats_port) if stats_port else None))
+        else:
+            packet.status = _STATUS_REGISTERED
+            self.__invalidate__(sender_port) #Responses of a re-registered client may have changed
+            self.health.discard(sender_port) #A re-registered client starts with a closed circuit
+            framed = message.endswith(_FRAME_HINT) #Client offers the framed protocol
+            with self._lock:
+                if framed: self.clients_framed.add(sender_port)
+                else: self.clients_framed.discard(sender_port) #Re-registered without the framed protocol (e.g. setFraming(False))
+            response = f"$R1 [Registered] {_FRAME_HINT}" if framed else "$R1 [Registered]"
+        self.__reply_status__(switch_socket, packet, response)
+
+    def __forward_packet__(self, switch_socket: socket.socket, packet: _Packet) -> None:
+        """Request to another client, answered from the response cache or forwarded (guarded by the circuit breaker of the recipient)."""
+        sender_port, recipient_port = packet.sender_port, packet.recipient_port
+        if not packet.recipient_connected:
+            self.__reply_status__(switch_socket, packet, _NOT_FOUND_MESSAGE)
+            return
+        relay = packet.framed and AlphaSwitch._zero_copy and packet.recipient_framed and recipient_port != AlphaSwitch.switch_port
+        if relay: packet.request_log = f"{sender_port}:<{len(packet.payload)} bytes>:{recipient_port}" #Payload is not decoded
+
+        cache_message = response_payload = None
+        if self.response_cache is not None: #Cache hits do not need the circuit (and must not take its probe)
+            cache_message = bytes(packet.payload) if packet.framed else packet.message.encode()
+            response_payload = self.response_cache.get(recipient_port, cache_message)
+            if response_payload is not None: packet.status = _STATUS_CACHED
+        if response_payload is None and not self.health.allow(recipient_port): #Fail fast while the circuit of the recipient is open
+            packet.status = _STATUS_NO_RESPONSE
+            self.__reply_status__(switch_socket, packet, _CIRCUIT_OPEN_MESSAGE)
+            return
+
+        if response_payload is None:
+            if relay: forward_data = (packet.header, packet.payload) #The request header is passed through unchanged
+            elif packet.recipient_framed: forward_data = _pack_frame(sender_port, recipient_port, packet.payload if packet.framed else packet.message.encode())
+            elif packet.framed: forward_data = f"{sender_port}:{str(packet.payload, 'utf-8', 'replace')}:{recipient_port}".encode()
+            else: forward_data = packet.raw_data
+
+            while response_payload is None and packet.retries <= AlphaSwitch._retries: #Retried at once, a failing recipient is skipped by the circuit breaker instead of sleeping
+                try:
+                    forwarded_flags, response_payload = self.__forward__(packet.recipient_address, recipient_port, forward_data, packet.recipient_framed, AlphaSwitch._forward_timeout)
+                    packet.status = _STATUS_FORWARDED
+                    self.__health__(recipient_port, True)
+                    if cache_message is not None: self.response_cache.put(recipient_port, cache_message, response_payload, forwarded_flags)
+                except Exception: packet.retries+=1
+            if response_payload is None:
+                packet.status = _STATUS_NO_RESPONSE
+                self.__failed__(recipient_port)
+                self.__reply_status__(switch_socket, packet, _NO_RESPONSE_MESSAGE)
+                return
+
+        packet.response_payload = response_payload
+        if relay: packet.response_log = f"{recipient_port}:<{len(response_payload)} bytes>:{sender_port}"
+        try: #return the respond from the recipient to original sender (in the format of the request)
+            if packet.framed: self.__reply_frame__(switch_socket, recipient_port, sender_port, response_payload, 0, packet.tag)
+            else:
+                packet.response = f"{recipient_port}:{str(response_payload, 'utf-8', 'replace')}:{sender_port}" #Format response (sPort:Message:rPort)
+                switch_socket.sendall(packet.response.encode())
+        except ConnectionResetError: pass
+
+    def __log_packet__(self, packet: _Packet, describe: bool) -> AlphaLogRecord:
+        """Records the handled packet in the traffic log and the metrics (the log texts only if describe is set)."""
+        sender_port, recipient_port, status = packet.sender_port, packet.recipient_port, packet.status
+        forwarded = status in (_STATUS_FORWARDED, _STATUS_CACHED) and packet.response_payload is not None
+        response_size = packet.response_size if packet.response_size is not None else len(packet.response_payload) if forwarded else len(packet.response)
+        request_log = response_log = ""
+        if describe:
+            request_log = packet.request_log or f"{sender_port}:{_preview(packet.payload if packet.framed else packet.message, AlphaSwitch._log_preview)}:{recipient_port}"
+            if packet.response_log is not None: response_log = packet.response_log
+            elif forwarded: response_log = f"{recipient_port}:{_preview(packet.response_payload, AlphaSwitch._log_preview)}:{sender_port}"
+            else: response_log = _preview(packet.response, AlphaSwitch._log_preview) #Status and control responses (e.g. @stats) are shortened as a whole
+        record = self.__record__(packet.started, sender_port, recipient_port, packet.request_size, response_size, status, request_log, response_log)
+        if AlphaSwitch._metrics and packet.entries is not None:
+            for (port, message), (_, entry_status, data) in packet.entries: self.metrics.record(sender_port, port, len(message), len(data), record.latency, entry_status, 0)
+        elif AlphaSwitch._metrics: self.metrics.record(sender_port, recipient_port, packet.request_size, response_size, record.latency, status, packet.retries)
+        return record
+
+_MISSING = object() #No cached response
+
+class _MemoCache:
+    """LRU cache (optionally with a time to live) for the responses of pure handlers."""
+
+    def __init__(self, maxsize: int, ttl: float = None) -> None:
+        self.maxsize, self.ttl = maxsize, ttl
+        self._entries: OrderedDict = OrderedDict() #Message:(response, cached_at)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> object:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None: return _MISSING
+            if self.ttl is not None and time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, response: object) -> None:
+        with self._lock:
+            self._entries[key] = (response, time.monotonic())
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize: self._entries.popitem(last=False)
+
+class _Rule(NamedTuple):
+    response: object #Constant response or handler
+    memo: Union[_MemoCache, None] #Responses of a pure handler
+
+    def apply(self, message: str, sender_port: int, *args) -> object:
+        if not callable(self.response): return self.response
+        if self.memo is None: return self.response(message, sender_port, *args)
+        response = self.memo.get(message)
+        if response is _MISSING:
+            response = self.response(message, sender_port, *args)
+            self.memo.put(message, response)
+        return response
+
+class AlphaRouter:
     """
-    Virtual-Switch (used to manage data flows)
+    Compiled ruleset for the response methods, accepted wherever a ruleset dict is (frozenResponse(), dynamicResponse(), serveResponses()).
+    Rules are checked in this order: exact (hash lookup), prefix (trie, the longest prefix wins), regex (precompiled, whole message,
+    in the order added), predicate (callable, in the order added) and the default response.
 
-    Simple setup:
-    >>> virtual_switch = AlphaSwitch()
-    >>> while True:
-    >>>     virtual_switch.handleTraffic()
+    A response is a constant or a handler: handler(message, sender_port) for exact and predicate rules, handler(message, sender_port, rest)
+    for prefix rules and handler(message, sender_port, match) for regex rules. Handlers added with pure=True only depend on the message
+    and are memoized (LRU, cache_size entries per rule, optionally expiring after ttl seconds).
+
+    >>> router = AlphaRouter({"Hi Flynn!": "Hi! How are you?"})
+    >>> router.prefix("sensor/", lambda message, sender_port, sensor_id: read_sensor(sensor_id), pure=True, ttl=1.0)
+    >>> router.regex(r"set ([a-z]+) ([0-9]+)", lambda message, sender_port, match: set_value(*match.groups()))
+    >>> client.frozenResponse(router)
     """
 
-    switch_address: str = None 
-    switch_port: int = 25505
-    _startlog: bool = False
-    _blacklist_count: int  = 2 #How many times a connection can not respond before it is blacklisted
-    _byte_size: int = 4096 #Maximum amount of bytes a message can contain
+    def __init__(self, ruleset: dict = None, default: object = None, cache_size: int = 1024) -> None:
+        self.default = default #Response if no rule matches (None = no response)
+        self.cache_size = cache_size
+        self._exact: dict = {} #Message:_Rule
+        self._trie: dict = {} #Character:node, the _Rule of a prefix is stored under the key None
+        self._regexes: list = [] #[(compiled_pattern, _Rule), ...]
+        self._predicates: list = [] #[(predicate, _Rule), ...]
+        for message, response in (ruleset or {}).items(): self.exact(message, response)
 
-    def __init__(self) -> None:
-        self.transfer_count: int = 0 #Counts the amount of packages handled
-        self.clients_data: dict = {} #Saves the address of every connected port (Port:Address)
-        self.black_list: list = [] #Blacklist for non responding clients
-        self.log: list = [] #Saved logs
+    def exact(self, message: str, response: object, pure: bool = False, ttl: float = None) -> None:
+        """Responds to exactly this message."""
+        self._exact[message] = self.__rule__(response, pure, ttl)
 
-    @classmethod
-    def switchSetup(cls, port: int = None, address: str = None) -> None:
-        """Change the address data of the switch."""
-        if port is not None: cls.switch_port = port
-        if address is not None: cls.switch_address = address
+    def prefix(self, prefix: str, response: object, pure: bool = False, ttl: float = None) -> None:
+        """Responds to every message starting with the prefix (handlers get the rest of the message)."""
+        node = self._trie
+        for char in prefix: node = node.setdefault(char, {})
+        node[None] = self.__rule__(response, pure, ttl)
 
-    @classmethod
-    def startLog(cls) -> None:
-        """Start recording traffic and enable logging."""
-        cls._startlog = True
+    def regex(self, pattern: str, response: object, pure: bool = False, ttl: float = None, flags: int = 0) -> None:
+        """Responds to every message the pattern fully matches (handlers get the re.Match)."""
+        self._regexes.append((re.compile(pattern, flags), self.__rule__(response, pure, ttl)))
 
-    @classmethod
-    def stopLog(cls) -> None:
-        """Stop recording traffic and disable logging."""
-        cls._startlog = False
+    def predicate(self, predicate: Callable[[str], bool], response: object, pure: bool = False, ttl: float = None) -> None:
+        """Responds to every message for which predicate(message) is true."""
+        self._predicates.append((predicate, self.__rule__(response, pure, ttl)))
 
-    @classmethod
-    def setToleration(cls, toleration: int) -> None:
-        """
-        Change the number of times a client cannot respond until they are blacklisted.
-        Standard: 2
-        """
-        cls._blacklist_count = toleration
+    def resolve(self, message: str, sender_port: int = None) -> object:
+        """Returns the response of the first matching rule (the default response if none matches)."""
+        rule = self._exact.get(message)
+        if rule is not None: return rule.apply(message, sender_port)
 
-    @classmethod
-    def setByteSizeSwitch(cls, byte_size: int) -> None:
-        """
-        Change the maximum amount of bytes a message can contain.
-        Standard: 4096
-        """
-        cls._byte_size = byte_size
+        node, longest = self._trie, None
+        if None in node: longest = (node[None], 0)
+        for index, char in enumerate(message):
+            node = node.get(char)
+            if node is None: break
+            if None in node: longest = (node[None], index + 1)
+        if longest is not None: return longest[0].apply(message, sender_port, message[longest[1]:])
 
-    @property
-    def getNewestLog(self) -> str:
-        """Returns the newest recorded log."""
-        return str(self.log[-1])
+        for pattern, rule in self._regexes:
+            match = pattern.fullmatch(message)
+            if match is not None: return rule.apply(message, sender_port, match)
+        for predicate, rule in self._predicates:
+            if predicate(message): return rule.apply(message, sender_port)
+        return self.default
+
+    def __call__(self, message: str, sender_port: int) -> object:
+        return self.resolve(message, sender_port) #Usable as serveResponses() handler
+
+    def __rule__(self, response: object, pure: bool, ttl: Union[float, None]) -> _Rule:
+        return _Rule(response, _MemoCache(self.cache_size, ttl) if pure and callable(response) else None)
+
+class AlphaReply(NamedTuple):
+    """
+    Response of a handler with a caching hint for the switch (only sent with the framed protocol).
     
-    @property
-    def getFullLog(self) -> list:
-        """Returns the entire logging history."""
-        return self.log
+    >>> client.serveResponses(lambda message, sender_port: AlphaReply(read_config(message), cacheable=True))
+    """
+    data: object
+    cacheable: bool = True
 
-    def handleTraffic(self) -> tuple[str, str, int, str, str, float]:
-        """
-        Handles/Manages all data flow from clients.
-        Return order: (response, sender_address, sender_port, decoded_data, date_time, package_respond_time (in sec))
-        """
-        if AlphaSwitch.switch_address is None: raise MissingAddressSetup 
+class AlphaStream:
+    """
+    Iterator over the chunks (bytes) of a received stream, decompressed and in order. Chunks are read from the connection
+    while iterating, so a stream of any size only needs the memory of one chunk. Handlers set with AlphaClient.setStreamHandler()
+    get the stream of the request, AlphaClient.requestStream() returns the stream of the response.
 
-        port_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        port_socket.bind((AlphaSwitch.switch_address, AlphaSwitch.switch_port))
-        port_socket.listen(1)
+    >>> for chunk in client.requestStream(70770, b"dump.bin"): dump_file.write(chunk)
+    """
 
-        switch_socket, address = port_socket.accept()
-        start_handle_time = time.time()
-        decoded_data = str(switch_socket.recv(AlphaSwitch._byte_size).decode()) #Raw data (sPORT:Message:rPORT)
+    def __init__(self, sock: socket.socket, sender_port: int, codec: Union[str, None] = None, owned: bool = False) -> None:
+        self.sender_port: int = sender_port
+        self.codec: Union[str, None] = codec #Negotiated compression codec (None = uncompressed)
+        self.size: int = 0 #Bytes received so far (decompressed)
+        self.finished: bool = False
+        self._sock = sock
+        self._owned = owned #Close the connection after the last chunk
 
-        sender_port, recipient_port, str_data = (
-            int(decoded_data[:5]),
-            int(decoded_data[-5:]),
-            decoded_data[6:-6],
-        )
+    def __iter__(self) -> "AlphaStream":
+        return self
 
-        if sender_port not in (self.clients_data).keys(): 
-            self.clients_data[int(sender_port)] = str(address[0]) #Add address for the port (Port:Address)
+    def __next__(self) -> bytes:
+        while not self.finished:
+            flags, _, _, payload = _recv_frame(self._sock)
+            if not flags & _FLAG_STREAM: #Answered with one frame
+                self.__finish__()
+                chunk = bytes(payload)
+            elif payload[0] == _STREAM_END:
+                self.__finish__()
+                break
+            elif payload[0] == _STREAM_COMPRESSED: chunk = _STREAM_CODECS[self.codec][1](memoryview(payload)[1:])
+            else: chunk = bytes(memoryview(payload)[1:])
+            self.size += len(chunk)
+            return chunk
+        raise StopIteration
 
-        sender_address = None
-        if int(recipient_port) in (self.clients_data.keys()):
-            sender_address: str = self.clients_data[sender_port]
+    def read(self) -> bytes:
+        """Returns all remaining chunks joined."""
+        return b"".join(self)
 
-            responded: int = 0
-            response = None
-            while responded < 2:
-                try:
-                    client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    client_socket.connect((sender_address, recipient_port))
-                    client_socket.sendall(decoded_data.encode())
-                    message_response = client_socket.recv(AlphaSwitch._byte_size).decode()
-                    client_socket.close()
-                    response = f"{recipient_port}:{message_response}:{sender_port}" #Format response (sPort:Message:rPort) 
-                    while recipient_port in self.black_list: self.black_list.remove(recipient_port) #Remove port from blacklist if port is responding
-                    responded = 2
-                except Exception:
-                    responded+=1
-                    time.sleep(0.25)
-
-            if response is None: 
-                response = f"{AlphaSwitch.switch_port}:$E5 [NoResponse] 'The client has been disconnected or traffic could be high? (request-timeout?)':{sender_port}"
-                self.black_list.append(recipient_port) #Add to blacklist if not responding
-                if sum(1 for black_list_port in self.black_list if black_list_port == recipient_port) == AlphaSwitch._blacklist_count and recipient_port in self.clients_data.keys(): del self.clients_data[recipient_port] #remove the port from connections if port isn't responding 3 times
-        else: response = f"{AlphaSwitch.switch_port}:$E4 [NotFound] 'This client is not connected to the network.':{sender_port}"
-        if int(recipient_port) == AlphaSwitch.switch_port and str_data != "@all __port__": response = f"{AlphaSwitch.switch_port}:$R1 [Registered]:{sender_port}" #AlphaClient.registerSwitch() response
-        if int(recipient_port) == AlphaSwitch.switch_port and str_data == "@all __port__": #return connected port list without brackets. Example: 25505, 80800, 55420
-            port_list_str = ""
-            for index, port_ in enumerate(list(self.clients_data.keys())):
-                if index == 0: port_list_str = str(port_)
-                else: port_list_str = f"{port_list_str}, {port_}"
-            response = f"{AlphaSwitch.switch_port}:{port_list_str}:{sender_port}" #all connected ports response
-        
-        try: switch_socket.sendall(str(response).encode()) #return the respond from the recipient to original sender
-        except ConnectionResetError: pass
-        end_time = time.time()
-        self.transfer_count += 1
-        elapsed_time = round(end_time - start_handle_time, 5)
+    def drain(self) -> None:
+        """Skips the remaining chunks."""
+        for _ in self: pass
+
+    def close(self) -> None:
+        """Closes the connection of a response stream that is not read to the end."""
+        if self._owned: self._sock.close()
+        self.finished = True
+
+    def __finish__(self) -> None:
+        self.finished = True
+        if self._owned: self._sock.close()
+
+class _StreamEncoder:
+    """Sends chunks as stream frames, compressed with the negotiated codec unless they are small or did not compress."""
+
+    def __init__(self, sock: socket.socket, sender_port: int, recipient_port: int, codec: Union[str, None], chunk_size: int = _STREAM_CHUNK_SIZE) -> None:
+        self.sock, self.sender_port, self.recipient_port, self.codec, self.chunk_size = sock, sender_port, recipient_port, codec, chunk_size
+        self._skip = 0 #Chunks left to send uncompressed
 
-        switch_socket.close()
-        port_socket.close()
+    def write(self, chunk: Union[bytes, str]) -> None:
+        data = memoryview(chunk if isinstance(chunk, (bytes, bytearray, memoryview)) else str(chunk).encode())
+        for offset in range(0, len(data), self.chunk_size): self.__send__(data[offset:offset + self.chunk_size])
 
-        now = datetime.now()
-        date_string = now.strftime("%d/%m/%Y %H:%M:%S")
+    def close(self) -> None:
+        _send_chunk(self.sock, self.sender_port, self.recipient_port, _STREAM_END)
 
-        if AlphaSwitch._startlog: self.log.append(f"{date_string} Package[{self.transfer_count}]: \t {decoded_data} \t -> ({elapsed_time}s) -> \t {response}") #Record log
-        return (response, sender_address, sender_port, decoded_data, date_string, elapsed_time)
+    def __send__(self, data: memoryview) -> None:
+        if self.codec is not None and len(data) >= _STREAM_MIN_COMPRESS and not self._skip:
+            compressed = _STREAM_CODECS[self.codec][0](data)
+            if len(compressed) < len(data) * 0.9: return _send_chunk(self.sock, self.sender_port, self.recipient_port, _STREAM_COMPRESSED, compressed)
+            self._skip = _STREAM_SKIP #Incompressible, try again later
+        elif self._skip: self._skip -= 1
+        _send_chunk(self.sock, self.sender_port, self.recipient_port, _STREAM_DATA, data)
 
 class AlphaClient:
     """
@@ -164,6 +2281,12 @@ class AlphaClient:
     """
 
     _byte_size_client: int = 4096 #Maximum amount of bytes a message can contain
+    _framing_client: bool = True #Offer the framed protocol when registering at the switch
+    _retries_client: int = 2 #Additional attempts if the switch could not be reached
+    _timeout_client: float = None #Seconds a request waits for its response (None = no limit)
+    _backoff_client: float = 0.5 #Seconds before the first retry (doubled on every further retry, with jitter)
+    _max_backoff_client: float = 4.0 #Longest pause between two retries
+    _stream_codecs_client: tuple = tuple(_STREAM_CODECS) #Compression codecs accepted for received streams
 
     def __init__(self) -> None:
         self.address_: str = None #Client address
@@ -172,7 +2295,15 @@ class AlphaClient:
         self.switch_address: str = None #Bridged switch address
         self.switch_port: int = 25505 #Bridged switch port
 
-        self.flag_: bool = False #Thread kill flag
+        self._responder = _ServeLoop(self.__serve_request__) #Engine of every response method
+        self._responder_lock = threading.Lock()
+        self._handler: Callable[[str, int], object] = None #Handler of the running responder
+        self._flag_stoppable: bool = True #Whether responseFlag() stops the running responder
+        self._pending_requests: queue.Queue = queue.Queue() #Requests waiting for dynamicResponse()/confirmationResponse()
+        self._queue_wait: float = _QUEUE_WAIT #Seconds a request waits for the next dynamicResponse()/confirmationResponse() call
+        self.framing_: bool = False #Whether the bridged switch accepted the framed protocol
+        self._stream_handler: Callable[[AlphaStream, int], object] = None #Handler of received streams (setStreamHandler())
+        self._error_handler: Callable[[Exception, object, int], None] = None #Reports failing handlers (setErrorHandler())
 
     def clientSetup(self, port: int = None, address: str = None) -> None:
         """Set/Change the address data of the client."""
@@ -185,8 +2316,8 @@ class AlphaClient:
         if address is not None: self.switch_address = address
 
     def responseFlag(self) -> None: 
-        """Kills the auto-response thread by using a flag."""
-        self.flag_ = True
+        """Stops the running response method (same as stopResponses(), unless it was started with flag=False)."""
+        if self._flag_stoppable: self.stopResponses()
     
     @classmethod
     def setByteSizeClient(cls, byte_size: int) -> None:
@@ -196,23 +2327,92 @@ class AlphaClient:
         """
         cls._byte_size_client = byte_size
 
+    @classmethod
+    def setFraming(cls, enabled: bool) -> None:
+        """
+        Enable/Disable negotiating the framed protocol (binary header, payloads of any size) in registerSwitch().
+        Standard: True
+        """
+        cls._framing_client = enabled
+
+    @classmethod
+    def setStreamCodecs(cls, *codecs: str) -> None:
+        """
+        Change the compression codecs accepted for received streams (no codec disables compression).
+        Standard: zlib, lzma (if available)
+        """
+        unknown = [codec for codec in codecs if codec not in _STREAM_CODECS]
+        if unknown: raise ValueError(f"Unknown codecs {unknown}, expected some of {tuple(_STREAM_CODECS)}")
+        cls._stream_codecs_client = codecs
+
+    def setStreamHandler(self, handler: Union[Callable[[AlphaStream, int], object], None]) -> None:
+        """
+        Answer streams with handler(stream, sender_port), which can read the chunks while they arrive (see AlphaStream).
+        Without it, streams are joined and passed to the running response method as message.
+        A generator (or any iterator) returned by either handler is streamed back to the sender. Streams are half-duplex,
+        the response starts after the request stream (chunks the handler did not read are skipped).
+        """
+        self._stream_handler = handler
+
+    def setErrorHandler(self, handler: Union[Callable[[Exception, object, int], None], None]) -> None:
+        """
+        Report exceptions of response handlers with handler(exception, message, sender_port) instead of printing the traceback.
+        The request is answered with $E7 [HandlerError], so the switch does not take the client for unresponsive.
+        """
+        self._error_handler = handler
+
+    @classmethod
+    def setRetriesClient(cls, retries: int = 2, timeout: float = None) -> None:
+        """
+        Change the number of additional attempts if the switch could not be reached and the seconds a request waits for its response (None = no limit).
+        Standard: 2, None
+        """
+        cls._retries_client, cls._timeout_client = retries, timeout
+
+    @classmethod
+    def setBackoffClient(cls, backoff: float = 0.5, max_backoff: float = 4.0) -> None:
+        """
+        Change the pause before the first retry (doubled on every further retry, with jitter) and its maximum.
+        Standard: 0.5, 4.0
+        """
+        cls._backoff_client, cls._max_backoff_client = backoff, max_backoff
+
+    @staticmethod
+    def __attempts__() -> Iterator[int]:
+        """Yields the attempt numbers of a request, pausing with exponential backoff and jitter before every retry."""
+        for attempt in range(AlphaClient._retries_client + 1):
+            if attempt: time.sleep(_backoff(attempt - 1, AlphaClient._backoff_client, AlphaClient._max_backoff_client))
+            yield attempt
+
     @staticmethod
     def __sending_data__(port: int, address: str, data: str) -> Union[str, None]:
-        for i in range(3):
+        for _attempt in AlphaClient.__attempts__():
             try:
-                client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                client_socket.connect((address, port))
-                client_socket.sendall(data.encode())
-                response: str = str(client_socket.recv(AlphaClient._byte_size_client).decode()) #Raw data (sPort:Message:rPort)
-                client_socket.close()
-                return response
-            except Exception: time.sleep(0.5)
+                with _transport(address).connect(address, port, AlphaClient._timeout_client) as client_socket:
+                    client_socket.sendall(data.encode())
+                    return str(client_socket.recv(AlphaClient._byte_size_client).decode()) #Raw data (sPort:Message:rPort)
+            except Exception: continue
+        return None
+
+    @staticmethod
+    def __sending_frame__(port: int, address: str, frame: bytes) -> Union[tuple[int, int, int, bytearray], None]:
+        for _attempt in AlphaClient.__attempts__():
+            try:
+                with _transport(address).connect(address, port, AlphaClient._timeout_client) as client_socket:
+                    client_socket.sendall(frame)
+                    return _recv_frame(client_socket) #(flags, sender_port, recipient_port, payload)
+            except Exception: continue
         return None
 
     def registerSwitch(self) -> None:
-        """Establishes a connection to the switch in advance so that the switch can register the client."""
+        """
+        Establishes a connection to the switch in advance so that the switch can register the client.
+        The framed protocol is used for further requests if both the client and the switch support it.
+        """
         if self.address_ is None or self.switch_address is None: raise MissingAddressSetup
-        self.__sending_data__(port=self.switch_port, address=self.switch_address, data=f"{self.port_}:Register:{self.switch_port}")
+        register_message = f"Register {_FRAME_HINT}" if AlphaClient._framing_client else "Register"
+        response = self.__sending_data__(port=self.switch_port, address=self.switch_address, data=f"{self.port_}:{register_message}:{self.switch_port}")
+        self.framing_ = AlphaClient._framing_client and response is not None and _FRAME_HINT in response
 
     def request(self, message: str, not_switch_port: int = None, not_switch_address: str = None) -> tuple[str, int]:
         """
@@ -222,6 +2422,11 @@ class AlphaClient:
         Return order: (response_data, sender_port)
         """
         if self.address_ is None or self.switch_address is None: raise MissingAddressSetup
+        if self.framing_ and not_switch_port is None and not_switch_address is None: #Send the text packet as frame
+            sender_port, _, str_data = message.partition(":")
+            str_data, _, recipient_port = str_data.rpartition(":")
+            response, sender_port = self.requestBytes(str_data.encode(), int(recipient_port))
+            return (None, None) if response is None else (response.decode(errors="replace"), sender_port)
         if not_switch_port is None: not_switch_port = self.switch_port 
         if not_switch_address is None: not_switch_address = self.switch_address
 
@@ -237,15 +2442,66 @@ class AlphaClient:
             return (str_data, sender_port)
         else:
             return (None, None)
+
+    def requestBytes(self, payload: bytes, port: int) -> tuple[bytes, int]:
+        """
+        Requests a data packet of any size using the framed protocol (requires registerSwitch() to negotiate it).
+        Return order: (response_data, sender_port)
+        """
+        if self.address_ is None or self.switch_address is None: raise MissingAddressSetup
+        if not self.framing_: raise FramingNotNegotiated
+
+        response = self.__sending_frame__(port=self.switch_port, address=self.switch_address, frame=_pack_frame(self.port_, port, payload))
+        if response is None: return (None, None)
+        return (bytes(response[3]), response[1])
         
-    def generalRequest(self, message: str) -> list[tuple[str, int]]:
+    def requestStream(self, port: int, chunks: Union[bytes, str, Iterator], compression: str = None, chunk_size: int = _STREAM_CHUNK_SIZE) -> AlphaStream:
+        """
+        Sends the chunks (bytes/str of any size, e.g. a generator reading a file) as a stream through the switch and returns the response
+        as AlphaStream, which is read while iterating. With compression ('zlib' or 'lzma') the chunks are compressed if the recipient accepts it,
+        small and incompressible chunks are sent uncompressed. Raises StreamRefused if the switch refused the stream ($E4, $E5, $E6).
+
+        >>> for chunk in client.requestStream(70770, b"dump.bin"): dump_file.write(chunk)
+        """
+        if self.address_ is None or self.switch_address is None: raise MissingAddressSetup
+        if not self.framing_: raise FramingNotNegotiated
+        if compression is not None and compression not in _STREAM_CODECS: raise ValueError(f"Unknown codec {compression!r}, expected one of {tuple(_STREAM_CODECS)}")
+
+        client_socket = _transport(self.switch_address).connect(self.switch_address, self.switch_port, AlphaClient._timeout_client)
+        try:
+            client_socket.sendall(_pack_frame(self.port_, port, bytes((_STREAM_OPEN,)) + (compression or "").encode(), _FLAG_STREAM))
+            flags, _, _, accept = _recv_frame(client_socket)
+            if not flags & _FLAG_STREAM: raise StreamRefused(accept.decode(errors="replace"))
+            codec = accept[1:].decode() or None
+            encoder = _StreamEncoder(client_socket, self.port_, port, codec, chunk_size)
+            for chunk in ([chunks] if isinstance(chunks, (bytes, bytearray, str)) else chunks): encoder.write(chunk)
+            encoder.close()
+        except BaseException:
+            client_socket.close()
+            raise
+        return AlphaStream(client_socket, port, codec, owned=True)
+
+    def sendStream(self, port: int, chunks: Union[bytes, str, Iterator], compression: str = None, chunk_size: int = _STREAM_CHUNK_SIZE) -> tuple[bytes, int]:
+        """
+        Sends the chunks as a stream (see requestStream()) and returns the joined response.
+        Return order: (response_data, sender_port), errors of the switch are returned like requestBytes() does.
+        """
+        try: return (self.requestStream(port, chunks, compression, chunk_size).read(), port)
+        except StreamRefused as error: return (error.response.encode(), self.switch_port)
+        except OSError: return (None, None)
+
+    def generalRequest(self, message: str, timeout: float = 5.0) -> list[tuple[str, int]]:
         """
         @all
 
         Requests data packets for each connected client and returns all responses from the requested clients (can be used for data trading).
-        *Note: Sending requests is serial and can be slow (not every recipient receives the message at the same time).*
+        The switch sends the message to every client in parallel and returns the responses that arrived within the timeout (others are None).
         Return: [(response_data, sender_port), ...]
         """
+        responses = self.__cast__(f"@broadcast {timeout} ".encode() + str(message).encode())
+        if responses is not None: return [(None if response is None else response.decode(errors="replace"), port) for response, port in responses]
+
+        #Switch without broadcast support: request every client one after another
         port_response, _1 = self.request(f"{self.port_}:@all __port__:{self.switch_port}") #requests all connected-ports from switch
         connected_port = list(map(int, port_response.split(", "))) #converts connected-port response to list of int ports
         
@@ -255,7 +2511,63 @@ class AlphaClient:
                 response, sender_port = self.request(message=f"{self.port_}:{message}:{port}")
                 return_structure.append((response, sender_port))
         return return_structure
-        
+
+    def multicastRequest(self, message: Union[str, bytes], ports: list[int], timeout: float = 5.0) -> list[tuple[Union[str, bytes], int]]:
+        """
+        Requests data packets from the given ports, sent by the switch in parallel.
+        Responses that did not arrive within the timeout are None. A bytes message returns bytes responses.
+        Return: [(response_data, sender_port), ...]
+        """
+        raw = isinstance(message, (bytes, bytearray))
+        responses = self.__cast__(f"@multicast {timeout} {','.join(str(port) for port in ports)} ".encode() + (bytes(message) if raw else str(message).encode()))
+        if responses is None: return [(None, port) for port in ports] #Switch without multicast support
+        return [(response if raw or response is None else response.decode(errors="replace"), port) for response, port in responses]
+
+    def requestBatch(self, entries: list[tuple[int, Union[str, bytes]]]) -> list[tuple[Union[str, bytes], int]]:
+        """
+        Requests many data packets in one packet. The switch forwards the requests grouped by recipient and answers in their order.
+        Errors ($E4, $E5) are reported per entry like request() does. A bytes message returns a bytes response.
+        Switches without batch support (or without the framed protocol) are requested serially.
+        Return: [(response_data, sender_port), ...]
+
+        >>> client.requestBatch([(70770, "Hi Flynn!"), (80880, "Hi Sam!")])
+        """
+        if self.address_ is None or self.switch_address is None: raise MissingAddressSetup
+        if self.framing_:
+            payload = _pack_records([(port, bytes(message) if isinstance(message, (bytes, bytearray)) else str(message).encode()) for port, message in entries], _BATCH_REQUEST)
+            response = self.__sending_frame__(port=self.switch_port, address=self.switch_address, frame=_pack_frame(self.port_, self.switch_port, payload, _FLAG_BATCH))
+            if response is None: return [(None, None)] * len(entries)
+            if response[0] & _FLAG_BATCH: return [self.__batch_result__(message, *result) for (_, message), result in zip(entries, _unpack_records(response[3], _AGGREGATE_RECORD))]
+            if response[3].startswith(b"$E"): return [(response[3].decode(errors="replace"), self.switch_port)] * len(entries) #Rejected by the switch ($E6)
+        return [self.requestBytes(bytes(message), port) if isinstance(message, (bytes, bytearray)) and self.framing_ else self.request(self.encode_format(message, port)) for port, message in entries]
+
+    def __batch_result__(self, message: Union[str, bytes], port: int, status: int, data: bytes) -> tuple[Union[str, bytes], int]:
+        """Return order of request(): (response_data, sender_port), errors are sent by the switch port."""
+        if status not in (_STATUS_FORWARDED, _STATUS_CACHED): port = self.switch_port
+        return (data if isinstance(message, (bytes, bytearray)) else data.decode(errors="replace"), port)
+
+    def __cast__(self, control_message: bytes) -> Union[list[tuple[Union[bytes, None], int]], None]:
+        """Sends a broadcast/multicast control message to the switch (None if the switch does not support it)."""
+        if self.address_ is None or self.switch_address is None: raise MissingAddressSetup
+        if self.framing_:
+            response = self.__sending_frame__(port=self.switch_port, address=self.switch_address, frame=_pack_frame(self.port_, self.switch_port, control_message))
+            if response is None or not response[0] & _FLAG_AGGREGATE: return None
+            return _unpack_aggregate(response[3])
+
+        response = self.__sending_data__(port=self.switch_port, address=self.switch_address, data=f"{self.port_}:{control_message.decode(errors='replace')}:{self.switch_port}")
+        if response is None: return None
+        try: return [(None if data is None else data.encode(), port) for port, data in json.loads(response[response.index(":") + 1:response.rindex(":")])]
+        except ValueError: return None #e.g. $R1 [Registered] from a switch that treats it as registration
+
+    def requestStats(self, port: int = None) -> dict:
+        """
+        Requests the traffic statistics of the switch (only those of the port if it is given).
+        Return: {"uptime": ..., "total": {...}, "senders": {port: {...}}, "recipients": {port: {...}}} (see AlphaSwitch.getStats())
+        """
+        stats_message = "@stats" if port is None else f"@stats {port}"
+        response, _1 = self.request(f"{self.port_}:{stats_message}:{self.switch_port}")
+        return json.loads(response)
+
     def encode_format(self, message: str, port: int = None) -> str: 
         """
         Encode the message into the correct format so that the data can be further processed and sent.
@@ -264,37 +2576,94 @@ class AlphaClient:
         if port is None: port = self.switch_port
         return f"{self.port_}:{message}:{port}" #Format response (sPort:Message:rPort) 
     
-    def frozenResponse(self, ruleset: dict, flag: bool = True) -> None:
+    @staticmethod
+    def __receive_request__(switch_socket: socket.socket) -> Union[tuple[bool, int, str], None]:
+        """
+        Receives one request as text packet or frame (None if the connection was closed).
+        Return order: (framed, sender_port, message) (a list of messages for a batch frame, an AlphaStream for a stream)
+        """
+        first_byte = switch_socket.recv(1, socket.MSG_PEEK)
+        if not first_byte: return None
+        if first_byte[0] == _FRAME_MAGIC:
+            flags, sender_port, _, payload = _recv_frame(switch_socket)
+            if flags & _FLAG_STREAM: return (True, sender_port, AlphaStream(switch_socket, sender_port, _choose_codec(payload[1:], AlphaClient._stream_codecs_client)))
+            if flags & _FLAG_BATCH: return (True, sender_port, [message.decode(errors="replace") for _, message in _unpack_records(payload, _BATCH_ENTRY)])
+            return (True, sender_port, payload.decode(errors="replace"))
+
+        decoded_data = str(switch_socket.recv(AlphaClient._byte_size_client).decode()) #Raw data (sPort:Message:rPort)
+        return (False, int(decoded_data[:5]), decoded_data[6:-6])
+
+    def __send_response__(self, switch_socket: socket.socket, framed: bool, sender_port: int, response) -> None:
+        """Answers a request in the format it was received in (bytes are sent unchanged as frame payload)."""
+        if not framed: switch_socket.sendall(str(response.data if isinstance(response, AlphaReply) else response).encode())
+        else: switch_socket.sendall(_pack_frame(self.port_, sender_port, *self.__encode_response__(response)[::-1]))
+
+    def __serve_stream__(self, switch_socket: socket.socket, stream: AlphaStream) -> None:
+        """Accepts the stream with the negotiated codec, passes it to the handler and answers with one frame or a stream."""
+        _send_chunk(switch_socket, self.port_, stream.sender_port, _STREAM_ACCEPT, (stream.codec or "").encode())
+        if self._stream_handler is not None: response = self.__call_handler__(self._stream_handler, stream, stream.sender_port)
+        else: response = self.__call_handler__(lambda message, sender_port: self._handler(message.read().decode(errors="replace"), sender_port), stream, stream.sender_port)
+        stream.drain() #Chunks the handler did not read
+
+        if not isinstance(response, Iterator): return self.__send_response__(switch_socket, True, stream.sender_port, response)
+        encoder = _StreamEncoder(switch_socket, self.port_, stream.sender_port, stream.codec)
+        try:
+            for chunk in response: encoder.write(chunk)
+        except Exception as error: #Part of the response is sent already, the connection is closed to cut the stream off
+            self.__report__(error, stream, stream.sender_port)
+            raise
+        encoder.close()
+
+    def __send_batch__(self, switch_socket: socket.socket, sender_port: int, responses: list) -> None:
+        """Answers a batch frame with one batch frame (responses in the order of the requests)."""
+        switch_socket.sendall(_pack_frame(self.port_, sender_port, _pack_records([self.__encode_response__(response) for response in responses], _BATCH_ENTRY), _FLAG_BATCH))
+
+    @staticmethod
+    def __encode_response__(response) -> tuple[int, bytes]:
+        """Return order: (flags, response_data)"""
+        flags = 0
+        if isinstance(response, AlphaReply): response, flags = response.data, _FLAG_CACHEABLE if response.cacheable else _FLAG_UNCACHEABLE
+        if isinstance(response, Iterator): response = b"".join(chunk if isinstance(chunk, (bytes, bytearray)) else str(chunk).encode() for chunk in response) #Streamed to streams only
+        return (flags, bytes(response) if isinstance(response, (bytes, bytearray)) else str(response).encode())
+
+    def serveResponses(self, handler: Callable[[str, int], object], workers: int = 8, backlog: int = 128, flag: bool = True) -> None:
+        """
+        Binds the client port once and answers every request with handler(message, sender_port) until stopResponses() is called.
+        Requests are handled concurrently by a pool of worker threads. The handler may return str, bytes or any other object (str()).
+        With flag=False the responder ignores responseFlag() and can only be stopped using stopResponses().
+
+        >>> client.serveResponses(lambda message, sender_port: message.upper())
+        """
+        port_socket = self.__bind_responder__(handler, backlog, flag)
+        try: self._responder.serve(port_socket, workers)
+        finally: self.__release_responder__()
+
+    def stopResponses(self) -> None:
+        """Stops the responder after the requests currently in flight have been answered."""
+        self._responder.stop()
+        while True: #Answer requests nobody is going to pick up anymore
+            try: response_future = self._pending_requests.get_nowait()[2]
+            except queue.Empty: break
+            response_future.cancel()
+    
+    def frozenResponse(self, ruleset: Union[dict, AlphaRouter], flag: bool = True, cacheable: bool = False) -> None:
         """
-        Automatically handles the client's response based on a specific predefined set of rules (dict).
+        Automatically handles the client's response based on a specific predefined set of rules (dict or AlphaRouter).
+        Blocks until stopResponses() or responseFlag() (if flag is True) is called.
+        With cacheable=True the responses of a dict ruleset are marked as cacheable for the switch (see AlphaSwitch.setResponseCache()).
         
         ruleset = {
             request:response
             (key):(value)
         }
         """
-        if self.address_ is None or self.switch_address is None: raise MissingAddressSetup
-        while not (flag and self.flag_):
-            try:
-                port_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                port_socket.bind((self.address_, self.port_))
-                port_socket.listen(1)
-
-                switch_socket, address = port_socket.accept()
-                decoded_data = str(switch_socket.recv(AlphaClient._byte_size_client).decode()) #Raw data (sPort:Message:rPort)
-
-                str_data = decoded_data[6:-6] #Message only from raw data
-                if str_data in ruleset.keys(): response = ruleset[str_data] #set response to value from ruleset key
-                else: response = None
-                
-                switch_socket.sendall(str(response).encode())
-                switch_socket.close()
-                port_socket.close()
-            except Exception: pass
+        if isinstance(ruleset, AlphaRouter): self.serveResponses(ruleset, flag=flag)
+        elif cacheable: self.serveResponses(lambda str_data, sender_port: AlphaReply(ruleset[str_data]) if str_data in ruleset else None, flag=flag)
+        else: self.serveResponses(lambda str_data, sender_port: ruleset.get(str_data), flag=flag) #set response to value from ruleset key
     
-    def dynamicResponse(self, dyn_ruleset: dict, refresh_time: float) -> tuple[str, str, int]:
+    def dynamicResponse(self, dyn_ruleset: Union[dict, AlphaRouter], refresh_time: float) -> tuple[str, str, int]:
         """
-        Handles the client's response based on a specific dynamically changeable ruleset (dict).
+        Handles the client's response based on a specific dynamically changeable ruleset (dict or AlphaRouter).
         Return order: (request_data, response_data, sender_port)
 
         ruleset = {
@@ -302,52 +2671,265 @@ class AlphaClient:
             (key):(value)
         }
         """
-        if self.address_ is None or self.switch_address is None: raise MissingAddressSetup
-        try:
-            port_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            port_socket.settimeout(refresh_time)
-            port_socket.bind((self.address_, self.port_))
-            port_socket.listen(1)
-
-            switch_socket, address = port_socket.accept()
-            decoded_data = str(switch_socket.recv(AlphaClient._byte_size_client).decode()) #Raw data (sPort:Message:rPort)
-
-            sender_port = int(decoded_data[:5])
-            str_data = decoded_data[6:-6]  #Message only from raw data
-            if str_data in dyn_ruleset.keys(): response = dyn_ruleset[str_data]  #set response to value from dyn_ruleset key
-            else: response = None
-            
-            switch_socket.sendall(str(response).encode())
-            switch_socket.close()
-            port_socket.close()
-            return (str(str_data), str(response), sender_port)
-        except Exception: return (None, None, None)
+        self.__queue_responder__(refresh_time)
+        request = self.__next_request__(refresh_time)
+        if request is None: return (None, None, None)
+        str_data, sender_port, response_future = request
+
+        if isinstance(dyn_ruleset, AlphaRouter): response = dyn_ruleset.resolve(str_data, sender_port)
+        elif str_data in dyn_ruleset.keys(): response = dyn_ruleset[str_data]  #set response to value from dyn_ruleset key
+        else: response = None
+        response_future.set_result(response)
+        return (str(str_data), str(response), sender_port)
 
     def confirmationResponse(self, confirmation_message: str) -> tuple[str, int]:
         """
         Returns the received request data and responds with a arrival confirmation.
         Return order: (message, sender_port)
         """
-        if self.address_ is None or self.switch_address is None: raise MissingAddressSetup
+        self.__queue_responder__(_QUEUE_WAIT)
         while True:
-            try:
-                port_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                port_socket.bind((self.address_, self.port_))
-                port_socket.listen(1)
-
-                switch_socket, address = port_socket.accept()
-                decoded_data = str(switch_socket.recv(AlphaClient._byte_size_client).decode()) #Raw data (sPort:Message:rPort)
-
-                if decoded_data is not None:
-                    sender_port, recipient_port, str_data = (
-                    int(decoded_data[:5]),
-                    decoded_data[-5:],
-                    decoded_data[6:-6],
-                )
-                
-                switch_socket.sendall(confirmation_message.encode())
-                switch_socket.close()
-                port_socket.close()
-
-                return (str_data, sender_port)
-            except Exception: pass
\ No newline at end of file
+            request = self.__next_request__(1.0)
+            if request is None:
+                if self._responder.running: continue
+                return (None, None) #Responder was stopped
+            str_data, sender_port, response_future = request
+            response_future.set_result(confirmation_message)
+            return (str_data, sender_port)
+
+    def __next_request__(self, timeout: float) -> Union[tuple[str, int, Future], None]:
+        """Next queued request that still waits for an answer (None after timeout seconds)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try: request = self._pending_requests.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty: return None
+            if request[2].set_running_or_notify_cancel(): return request #Skips requests that were answered with None meanwhile
+
+    def __bind_responder__(self, handler: Callable[[str, int], object], backlog: int, flag: bool) -> socket.socket:
+        if self.address_ is None or self.switch_address is None: raise MissingAddressSetup
+        with self._responder_lock:
+            if self._handler is not None: raise ResponderAlreadyRunning
+            self._handler = handler
+            self._flag_stoppable = flag
+        try: port_socket = _transport(self.address_).listen(self.address_, self.port_, backlog)
+        except BaseException:
+            self.__release_responder__()
+            raise
+        return port_socket
+
+    def __release_responder__(self) -> None:
+        with self._responder_lock: self._handler = None
+
+    def __queue_responder__(self, wait_time: float) -> None:
+        """
+        Starts a background responder (once) that passes requests to dynamicResponse()/confirmationResponse().
+        Requests wait up to wait_time seconds (the last refresh_time) for the next call and are answered with None afterwards.
+        """
+        self._queue_wait = wait_time
+        with self._responder_lock:
+            if self._handler == self.__queued_handler__: return
+        port_socket = self.__bind_responder__(self.__queued_handler__, 128, True)
+        threading.Thread(target=self.__serve_queue__, args=(port_socket,), daemon=True).start()
+
+    def __serve_queue__(self, port_socket: socket.socket) -> None:
+        try: self._responder.serve(port_socket)
+        finally: self.__release_responder__()
+
+    def __queued_handler__(self, str_data: str, sender_port: int) -> object:
+        response_future = Future()
+        self._pending_requests.put((str_data, sender_port, response_future))
+        if not wait([response_future], timeout=self._queue_wait).done and response_future.cancel(): return None #Not picked up in time (cancel() fails once it is)
+        while not wait([response_future], timeout=1.0).done: #Picked up, wait for the answer
+            if not self._responder.running and response_future.cancel(): return None
+        return None if response_future.cancelled() else response_future.result() #Cancelled by stopResponses()
+
+    def __serve_request__(self, switch_socket: socket.socket, address: tuple, detach: Callable[[], None]) -> bool:
+        request = self.__receive_request__(switch_socket)
+        if request is None: return False
+        framed, sender_port, str_data = request
+        if isinstance(str_data, AlphaStream): self.__serve_stream__(switch_socket, str_data)
+        elif isinstance(str_data, list): self.__send_batch__(switch_socket, sender_port, [self.__call_handler__(self._handler, message, sender_port) for message in str_data])
+        else: self.__send_response__(switch_socket, framed, sender_port, self.__call_handler__(self._handler, str_data, sender_port))
+        return True
+
+    def __call_handler__(self, handler: Callable[[object, int], object], message: object, sender_port: int) -> object:
+        """Calls the response handler. A failing handler is reported and answered with $E7, so the connection stays in sync."""
+        try: return handler(message, sender_port)
+        except Exception as error:
+            self.__report__(error, message, sender_port)
+            return _HANDLER_ERROR_MESSAGE
+
+    def __report__(self, error: Exception, message: object, sender_port: int) -> None:
+        if self._error_handler is not None:
+            try: self._error_handler(error, message, sender_port)
+            except Exception: traceback.print_exc()
+        else: traceback.print_exception(type(error), error, error.__traceback__)
+
+class AsyncAlphaClient:
+    """
+    Asyncio Virtual-Client (used to send many requests at once). Keeps one persistent connection to the switch
+    and tags every request with a correlation ID, so responses are matched even if they arrive out of order.
+    Requires a switch that supports the framed protocol. Responding to requests is done by AlphaClient.
+
+    >>> client = AsyncAlphaClient()
+    >>> client.clientSetup(80880, "Your IP-Address")
+    >>> client.bridge(25505, "Switch IP-Address")
+    >>> await client.registerSwitch()
+    >>> responses = await asyncio.gather(*(client.request(client.encode_format("Hi Flynn!", 70770)) for _ in range(100)))
+    """
+
+    _timeout_client: float = 10.0 #Seconds a request waits for its response (None = no limit)
+
+    def __init__(self) -> None:
+        self.address_: str = None #Client address
+        self.port_: int = 14606 #Client port
+
+        self.switch_address: str = None #Bridged switch address
+        self.switch_port: int = 25505 #Bridged switch port
+
+        self._reader: asyncio.StreamReader = None
+        self._writer: asyncio.StreamWriter = None
+        self._receiver: asyncio.Task = None #Reads the responses and resolves the pending requests
+        self._pending: dict = {} #Requests waiting for their response (correlation_id:Future)
+        self._next_id: int = 0
+        self._connect_lock: asyncio.Lock = None #Created inside the running event loop
+
+    def clientSetup(self, port: int = None, address: str = None) -> None:
+        """Set/Change the address data of the client."""
+        if port is not None: self.port_ = port
+        if address is not None: self.address_ = address
+
+    def bridge(self, port: int = None, address: str = None) -> None:
+        """Specify the address data of the switch for the connection."""
+        if port is not None: self.switch_port = port
+        if address is not None: self.switch_address = address
+
+    @classmethod
+    def setTimeoutClient(cls, timeout: float) -> None:
+        """
+        Change the default amount of seconds a request waits for its response.
+        Standard: 10.0
+        """
+        cls._timeout_client = timeout
+
+    def encode_format(self, message: str, port: int = None) -> str: 
+        """
+        Encode the message into the correct format so that the data can be further processed and sent.
+        Format: 'SENDER_PORT:MESSAGE:RECIPIENT_PORT'
+        """
+        if port is None: port = self.switch_port
+        return f"{self.port_}:{message}:{port}" #Format response (sPort:Message:rPort) 
+
+    async def registerSwitch(self, timeout: float = None) -> None:
+        """Connects to the switch and registers the client (the switch has to accept the framed protocol)."""
+        flags, _, response = await self.__exchange__(self.switch_port, f"Register {_FRAME_HINT}".encode(), timeout)
+        if _FRAME_HINT.encode() not in response: raise FramingNotNegotiated
+
+    async def request(self, message: str, timeout: float = None) -> tuple[str, int]:
+        """
+        @specific
+
+        Requests a data packet and returns the response from the request recipient. Can be awaited concurrently.
+        Raises asyncio.TimeoutError if the response does not arrive within the timeout.
+        Return order: (response_data, sender_port)
+        """
+        _, _, str_data = message.partition(":")
+        str_data, _, recipient_port = str_data.rpartition(":")
+        response, sender_port = await self.requestBytes(str_data.encode(), int(recipient_port), timeout)
+        return (response.decode(errors="replace"), sender_port)
+
+    async def requestBytes(self, payload: bytes, port: int, timeout: float = None) -> tuple[bytes, int]:
+        """
+        Requests a data packet of any size. Can be awaited concurrently.
+        Return order: (response_data, sender_port)
+        """
+        _, sender_port, response = await self.__exchange__(port, payload, timeout)
+        return (response, sender_port)
+
+    async def requestBatch(self, entries: list[tuple[int, Union[str, bytes]]], timeout: float = None) -> list[tuple[Union[str, bytes], int]]:
+        """
+        Requests many data packets in one frame, forwarded by the switch grouped by recipient (see AlphaClient.requestBatch()).
+        Return: [(response_data, sender_port), ...]
+        """
+        payload = _pack_records([(port, bytes(message) if isinstance(message, (bytes, bytearray)) else str(message).encode()) for port, message in entries], _BATCH_REQUEST)
+        flags, _, response = await self.__exchange__(self.switch_port, payload, timeout, _FLAG_BATCH)
+        if response.startswith(b"$E") and not flags & _FLAG_BATCH: return [(response.decode(errors="replace"), self.switch_port)] * len(entries) #Rejected by the switch ($E6)
+        if not flags & _FLAG_BATCH: return [(None, port) for port, _ in entries] #Switch without batch support
+        return [(data if isinstance(message, (bytes, bytearray)) else data.decode(errors="replace"), port if status in (_STATUS_FORWARDED, _STATUS_CACHED) else self.switch_port)
+                for (_, message), (port, status, data) in zip(entries, _unpack_records(response, _AGGREGATE_RECORD))]
+
+    async def generalRequest(self, message: str, timeout: float = 5.0) -> list[tuple[str, int]]:
+        """
+        @all
+
+        Requests data packets for each connected client, sent by the switch in parallel.
+        Responses that did not arrive within the timeout are None.
+        Return: [(response_data, sender_port), ...]
+        """
+        flags, _, response = await self.__exchange__(self.switch_port, f"@broadcast {timeout} ".encode() + str(message).encode(), timeout + 1.0)
+        if not flags & _FLAG_AGGREGATE: return [] #Switch without broadcast support
+        return [(None if data is None else data.decode(errors="replace"), port) for data, port in _unpack_aggregate(response)]
+
+    async def multicastRequest(self, message: Union[str, bytes], ports: list[int], timeout: float = 5.0) -> list[tuple[Union[str, bytes], int]]:
+        """
+        Requests data packets from the given ports, sent by the switch in parallel.
+        Responses that did not arrive within the timeout are None. A bytes message returns bytes responses.
+        Return: [(response_data, sender_port), ...]
+        """
+        raw = isinstance(message, (bytes, bytearray))
+        control_message = f"@multicast {timeout} {','.join(str(port) for port in ports)} ".encode() + (bytes(message) if raw else str(message).encode())
+        flags, _, response = await self.__exchange__(self.switch_port, control_message, timeout + 1.0)
+        if not flags & _FLAG_AGGREGATE: return [(None, port) for port in ports] #Switch without multicast support
+        return [(data if raw or data is None else data.decode(errors="replace"), port) for data, port in _unpack_aggregate(response)]
+
+    async def requestStats(self, port: int = None, timeout: float = None) -> dict:
+        """Requests the traffic statistics of the switch (only those of the port if it is given), see AlphaSwitch.getStats()."""
+        _, _, response = await self.__exchange__(self.switch_port, b"@stats" if port is None else f"@stats {port}".encode(), timeout)
+        return json.loads(response)
+
+    async def close(self) -> None:
+        """Closes the connection to the switch; pending requests fail with ConnectionResetError."""
+        if self._writer is not None:
+            self._writer.close()
+            try: await self._writer.wait_closed()
+            except OSError: pass
+        if self._receiver is not None: await asyncio.gather(self._receiver, return_exceptions=True)
+
+    async def __connect__(self) -> None:
+        if self.address_ is None or self.switch_address is None: raise MissingAddressSetup
+        if self._connect_lock is None: self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing(): return
+            transport = _transport(self.switch_address)
+            if transport is _TCP_TRANSPORT: self._reader, self._writer = await asyncio.open_connection(self.switch_address, self.switch_port)
+            else: self._reader, self._writer = await asyncio.open_connection(sock=transport.connect(self.switch_address, self.switch_port))
+            self._receiver = asyncio.get_running_loop().create_task(self.__receive__(self._reader, self._writer))
+
+    async def __exchange__(self, port: int, payload: bytes, timeout: float = None, flags: int = 0) -> tuple[int, int, bytes]:
+        """
+        Sends one tagged frame and waits for the response with the same correlation ID.
+        Return order: (flags, sender_port, response_data)
+        """
+        await self.__connect__()
+        correlation_id = self._next_id
+        self._next_id = (self._next_id + 1) % (1 << 32)
+        response_future = asyncio.get_running_loop().create_future()
+        self._pending[correlation_id] = response_future
+        try:
+            self._writer.write(_FRAME_HEADER.pack(_FRAME_MAGIC, _FRAME_VERSION, _FLAG_TAGGED | flags, self.port_, port, _TAG.size + len(payload)) + _TAG.pack(correlation_id) + payload)
+            await self._writer.drain()
+            return await asyncio.wait_for(response_future, self._timeout_client if timeout is None else timeout)
+        finally: self._pending.pop(correlation_id, None) #Late responses of timed out or cancelled requests are dropped
+
+    async def __receive__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                flags, sender_port, _, length = _parse_header(await reader.readexactly(_FRAME_HEADER.size))
+                payload = await reader.readexactly(length)
+                if not flags & _FLAG_TAGGED: continue #Every response of the switch is expected to be tagged
+                response_future = self._pending.get(_TAG.unpack_from(payload)[0])
+                if response_future is not None and not response_future.done(): response_future.set_result((flags, sender_port, payload[_TAG.size:]))
+        except (asyncio.IncompleteReadError, OSError, ValueError) as error:
+            for response_future in self._pending.values(): #Fail every request still waiting on this connection
+                if not response_future.done(): response_future.set_exception(ConnectionResetError(f"The connection to the switch was lost ({error!r})."))
+            writer.close()
@@ -2,4 +2,22 @@
 from .newalpha import AlphaSwitch
 
 # AlphaClient methods
-from .newalpha import AlphaClient
\ No newline at end of file
+from .newalpha import AlphaClient
+from .newalpha import AlphaRouter
+from .newalpha import AlphaReply
+from .newalpha import AlphaStream
+
+# AsyncAlphaClient methods
+from .newalpha import AsyncAlphaClient
+
+# Logging methods
+from .newalpha import AlphaTrafficLog
+
+# Statistics methods
+from .newalpha import AlphaMetrics
+
+# Transport methods
+from .newalpha import AlphaTransport
+from .newalpha import AlphaTcpTransport
+from .newalpha import AlphaUnixTransport
+from .newalpha import AlphaLocalTransport
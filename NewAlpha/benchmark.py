@@ -0,0 +1,283 @@
+"""
+Loopback benchmark of the switch and its clients.
+
+Starts an AlphaSwitch and N echo responders on 127.0.0.1 or another transport address (in-process or in separate processes),
+drives a weighted mix of requests from concurrent clients and reports throughput, p50/p99/p999 latency and error rates as JSON.
+
+>>> python -m NewAlpha.benchmark --responders 4 --concurrency 16 --duration 10 --mix small:8:request:64 --mix cast:1:broadcast:64 --output run.json
+>>> python -m NewAlpha.benchmark ... --compare run.json #Exit code 1 if a metric got worse than the tolerance
+>>> python -m NewAlpha.benchmark --large --zero-copy --compare run.json #Relay of large frames without copies against a run without --zero-copy
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import multiprocessing
+from typing import NamedTuple, Union
+
+from .newalpha import AlphaSwitch, AlphaClient
+
+_MIX_KINDS: tuple = ("request", "broadcast", "multicast") #AlphaClient.request(), generalRequest(), multicastRequest()
+_HIGHER_IS_BETTER: tuple = ("throughput",) #Every other compared metric (latency, error rate) is better when lower
+_COMPARED: tuple = ("throughput", "p50", "p99", "p999", "error_rate")
+_LARGE_PAYLOAD: int = 1_000_000 #Payload size of the --large mix (frames only, text packets are limited to the byte size of the switch)
+
+class BenchmarkMix(NamedTuple):
+    """One kind of request of the load (picked with a probability of weight / sum of all weights)."""
+    name: str
+    weight: float = 1.0
+    kind: str = "request"
+    payload_size: int = 64
+
+    @classmethod
+    def parse(cls, text: str) -> "BenchmarkMix":
+        """Parses 'NAME[:WEIGHT[:KIND[:PAYLOAD_SIZE]]]' (e.g. 'big:2:request:4000')."""
+        name, *values = text.split(":")
+        mix = cls(name, *(cast(value) for cast, value in zip((float, str, int), values)))
+        if mix.kind not in _MIX_KINDS: raise ValueError(f"Unknown request kind {mix.kind!r}, expected one of {_MIX_KINDS}")
+        return mix
+
+def _quantile(ordered: list[float], quantile: float) -> Union[float, None]:
+    """Nearest-rank percentile of a sorted list."""
+    if not ordered: return None
+    return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+def _summary(latencies: list[float], errors: int, duration: float) -> dict:
+    ordered = sorted(latencies)
+    requests = len(ordered)
+    return {
+        "requests": requests, "errors": errors,
+        "error_rate": round(errors / requests, 5) if requests else 0.0,
+        "throughput": round(requests / duration, 2) if duration > 0 else 0.0, #Requests/sec
+        "mean": round(sum(ordered) / requests, 6) if requests else None,
+        "p50": _quantile(ordered, 0.50), "p99": _quantile(ordered, 0.99), "p999": _quantile(ordered, 0.999),
+        "max": ordered[-1] if ordered else None,
+    }
+
+def _serve_switch(address: str, port: int, workers: int, zero_copy: bool, ready, stop) -> None:
+    """Runs the switch until stop is set (thread or process target)."""
+    zero_copy_before = AlphaSwitch._zero_copy
+    AlphaSwitch.setZeroCopy(zero_copy)
+    switch = AlphaSwitch()
+    switch.switchSetup(port, address)
+    server = threading.Thread(target=switch.serveForever, kwargs=dict(workers=workers), daemon=True)
+    server.start()
+    ready.set()
+    stop.wait()
+    switch.shutdown()
+    server.join()
+    AlphaSwitch.setZeroCopy(zero_copy_before) #The switch class is shared with the caller if it runs in this process
+
+def _serve_responders(address: str, switch_port: int, ports: list[int], framing: bool, ready, stop) -> None:
+    """Runs an echo responder on every port until stop is set (thread or process target)."""
+    AlphaClient.setFraming(framing)
+    responders = []
+    for port in ports:
+        responder = AlphaClient()
+        responder.clientSetup(port, address)
+        responder.bridge(switch_port, address)
+        responder.registerSwitch()
+        threading.Thread(target=responder.serveResponses, args=(lambda message, sender_port: message,), daemon=True).start()
+        responders.append(responder)
+    time.sleep(0.2) #Responders are bound
+    ready.set()
+    stop.wait()
+    for responder in responders: responder.stopResponses()
+
+def _generate_load(address: str, switch_port: int, client_ports: list[int], responder_ports: list[int], mixes: list, framing: bool, warmup: float, duration: float, seed: int, results) -> None:
+    """
+    Sends requests from one client per port (one thread each) for warmup + duration seconds.
+    Puts {mix_name: (latencies, errors)} of the measured period into results (list or multiprocessing queue).
+    """
+    AlphaClient.setFraming(framing)
+    mixes = [BenchmarkMix(*mix) for mix in mixes]
+    weights = [mix.weight for mix in mixes]
+    payloads = {mix.name: "x" * mix.payload_size for mix in mixes}
+    measured = {mix.name: ([], [0]) for mix in mixes}
+    lock = threading.Lock()
+    start = time.perf_counter() + warmup
+    end = start + duration
+
+    def requester(port: int, rng: random.Random) -> None:
+        client = AlphaClient()
+        client.clientSetup(port, address)
+        client.bridge(switch_port, address)
+        client.registerSwitch()
+        local = {mix.name: ([], 0) for mix in mixes}
+        while True:
+            mix = rng.choices(mixes, weights)[0]
+            payload = payloads[mix.name]
+            started = time.perf_counter()
+            if started >= end: break
+            try:
+                if mix.kind == "request":
+                    response, _ = client.request(client.encode_format(payload, rng.choice(responder_ports)))
+                    failed = response != payload
+                else:
+                    if mix.kind == "broadcast": responses = client.generalRequest(payload)
+                    else: responses = client.multicastRequest(payload, responder_ports)
+                    answered = {port_ for response, port_ in responses if response == payload}
+                    failed = any(port_ not in answered for port_ in responder_ports) #Requesting clients do not answer broadcasts
+            except Exception: failed = True
+            finished = time.perf_counter()
+            if started < start: continue #Warmup
+            latencies, errors = local[mix.name]
+            latencies.append(finished - started)
+            local[mix.name] = (latencies, errors + failed)
+        with lock:
+            for name, (latencies, errors) in local.items():
+                measured[name][0].extend(latencies)
+                measured[name][1][0] += errors
+
+    threads = [threading.Thread(target=requester, args=(port, random.Random(seed + port))) for port in client_ports]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    results.put({name: (latencies, errors[0]) for name, (latencies, errors) in measured.items()})
+
+class _Results(list):
+    """List with the put() method of a queue (in-process load generators)."""
+    put = list.append
+
+class AlphaBenchmark:
+    """
+    Loopback benchmark of an AlphaSwitch with echo responders.
+
+    >>> result = AlphaBenchmark(responders=4, concurrency=16, mixes=[BenchmarkMix("small", 8, "request", 64), BenchmarkMix("cast", 1, "broadcast", 64)]).run()
+    >>> result["total"]["throughput"], result["mixes"]["small"]["p99"]
+    """
+
+    def __init__(self, port: int = 21000, responders: int = 2, concurrency: int = 8, duration: float = 5.0, warmup: float = 1.0,
+                 mixes: list[BenchmarkMix] = None, processes: int = 0, switch_workers: int = 16, framing: bool = True, seed: int = 0,
+                 address: str = "127.0.0.1", zero_copy: bool = False) -> None:
+        """
+        processes=0 runs everything in this process (threads). Otherwise the switch and the responders get a process each
+        and the concurrent clients are split across the given number of load processes.
+        Ports: switch=port, responders=port+1..., clients=port+1000... (below the ephemeral port range, otherwise a port may already be taken by an outgoing connection)
+        The address selects the transport ('unix:DIRECTORY', 'local' only with processes=0), zero_copy calls AlphaSwitch.setZeroCopy().
+        """
+        if port < 10000 or port + 1000 + concurrency > 65535: raise ValueError("Ports must have 5 digits (10000 up to 65535)")
+        self.port, self.responders, self.concurrency, self.duration, self.warmup = port, responders, concurrency, duration, warmup
+        self.mixes = mixes or [BenchmarkMix("request")]
+        if not framing and any(mix.payload_size > AlphaSwitch._byte_size for mix in self.mixes): raise ValueError(f"Text packets are limited to {AlphaSwitch._byte_size} bytes, use frames for larger payloads")
+        self.processes, self.switch_workers, self.framing, self.seed, self.address, self.zero_copy = processes, switch_workers, framing, seed, address, zero_copy
+
+    def config(self) -> dict:
+        return {
+            "port": self.port, "responders": self.responders, "concurrency": self.concurrency, "duration": self.duration, "warmup": self.warmup,
+            "mixes": [mix._asdict() for mix in self.mixes], "processes": self.processes, "switch_workers": self.switch_workers, "framing": self.framing, "seed": self.seed, "address": self.address,
+            "zero_copy": self.zero_copy,
+        }
+
+    def run(self) -> dict:
+        """Runs the benchmark and returns the (JSON serializable) report."""
+        responder_ports = [self.port + 1 + index for index in range(self.responders)]
+        client_ports = [self.port + 1000 + index for index in range(self.concurrency)]
+        mixes = [tuple(mix) for mix in self.mixes]
+        if self.processes:
+            context = multiprocessing.get_context("spawn")
+            spawn, event, results = context.Process, context.Event, context.Queue()
+        else: spawn, event, results = threading.Thread, threading.Event, _Results()
+        stop, switch_ready, responders_ready = event(), event(), event()
+
+        services = [
+            spawn(target=_serve_switch, args=(self.address, self.port, self.switch_workers, self.zero_copy, switch_ready, stop), daemon=True),
+            spawn(target=_serve_responders, args=(self.address, self.port, responder_ports, self.framing, responders_ready, stop), daemon=True),
+        ]
+        services[0].start()
+        switch_ready.wait(30)
+        time.sleep(0.1) #Listening socket is bound
+        services[1].start()
+        responders_ready.wait(30)
+
+        groups = [client_ports[index::self.processes or 1] for index in range(self.processes or 1)]
+        generators = [spawn(target=_generate_load, args=(self.address, self.port, group, responder_ports, mixes, self.framing, self.warmup, self.duration, self.seed, results)) for group in groups if group]
+        for generator in generators: generator.start()
+        collected = [results.get() for _ in generators] if self.processes else None
+        for generator in generators: generator.join()
+        if collected is None: collected = list(results)
+
+        switch_stats = self.__switch_stats__(client_ports[0])
+        stop.set()
+        for service in services: service.join(10)
+
+        report = {"config": self.config(), "mixes": {}, "switch": switch_stats}
+        all_latencies, all_errors = [], 0
+        for mix in self.mixes:
+            latencies = [latency for part in collected for latency in part[mix.name][0]]
+            errors = sum(part[mix.name][1] for part in collected)
+            report["mixes"][mix.name] = _summary(latencies, errors, self.duration)
+            all_latencies += latencies
+            all_errors += errors
+        report["total"] = _summary(all_latencies, all_errors, self.duration)
+        return report
+
+    def __switch_stats__(self, port: int) -> Union[dict, None]:
+        """Totals the switch counted itself (requested like any client, so it also works across processes)."""
+        try:
+            client = AlphaClient()
+            client.clientSetup(port, self.address)
+            client.bridge(self.port, self.address)
+            return client.requestStats()["total"]
+        except Exception: return None
+
+    @staticmethod
+    def compare(baseline: dict, result: dict, tolerance: float = 0.1) -> dict:
+        """
+        Relative change of throughput, latency percentiles and error rate between two reports (total and every mix).
+        A change worse than the tolerance (0.1 = 10%) is listed as regression.
+        Return: {"changes": {"total": {"p99": 0.05, ...}, "MIX": {...}}, "regressions": ["total.p99", ...]}
+        """
+        changes, regressions = {}, []
+        sections = {"total": (baseline.get("total", {}), result.get("total", {}))}
+        sections.update({name: (baseline.get("mixes", {}).get(name, {}), values) for name, values in result.get("mixes", {}).items()})
+        for section, (old, new) in sections.items():
+            changes[section] = {}
+            for metric in _COMPARED:
+                if old.get(metric) is None or new.get(metric) is None: continue
+                if old[metric] == 0: change = 0.0 if new[metric] == 0 else float("inf")
+                else: change = round((new[metric] - old[metric]) / old[metric], 4)
+                changes[section][metric] = change
+                worse = -change if metric in _HIGHER_IS_BETTER else change
+                if metric == "error_rate" and old[metric] == 0 and new[metric] <= 0.001: worse = 0.0 #Noise of a single failed request
+                if worse > tolerance: regressions.append(f"{section}.{metric}")
+        return {"changes": changes, "regressions": regressions}
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m NewAlpha.benchmark", description="Loopback benchmark of the NewAlpha switch and clients.")
+    parser.add_argument("--port", type=int, default=21000, help="switch port (responders and clients use the following ports, keep them below the ephemeral port range)")
+    parser.add_argument("--responders", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent requesting clients")
+    parser.add_argument("--duration", type=float, default=5.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=1.0, help="seconds before the measurement")
+    parser.add_argument("--mix", action="append", type=BenchmarkMix.parse, help="NAME[:WEIGHT[:KIND[:PAYLOAD_SIZE]]], KIND: request, broadcast, multicast (repeatable)")
+    parser.add_argument("--processes", type=int, default=0, help="load processes (0 = everything in one process)")
+    parser.add_argument("--switch-workers", type=int, default=16)
+    parser.add_argument("--text", action="store_true", help="use the text protocol instead of frames")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--address", default="127.0.0.1", help="address of the switch and the clients, selects the transport (unix:DIRECTORY, local)")
+    parser.add_argument("--zero-copy", action="store_true", help="relay frames through reusable buffers (AlphaSwitch.setZeroCopy())")
+    parser.add_argument("--large", type=int, nargs="?", const=_LARGE_PAYLOAD, metavar="PAYLOAD_SIZE", help=f"add a mix of large requests (large:1:request:PAYLOAD_SIZE, Standard: {_LARGE_PAYLOAD})")
+    parser.add_argument("--output", help="write the report to this JSON file")
+    parser.add_argument("--compare", help="baseline report (JSON) to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="relative change counted as regression (with --compare)")
+    args = parser.parse_args(argv)
+    mixes = args.mix
+    if args.large is not None: mixes = (mixes or [BenchmarkMix("request")]) + [BenchmarkMix("large", 1.0, "request", args.large)]
+
+    try: benchmark = AlphaBenchmark(args.port, args.responders, args.concurrency, args.duration, args.warmup, mixes,
+                                    args.processes, args.switch_workers, not args.text, args.seed, args.address, args.zero_copy)
+    except ValueError as error: parser.error(str(error))
+    report = benchmark.run()
+    if args.compare:
+        with open(args.compare) as baseline_file: report["comparison"] = AlphaBenchmark.compare(json.load(baseline_file), report, args.tolerance)
+    if args.output:
+        with open(args.output, "w") as output_file: json.dump(report, output_file, indent=2)
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    return 1 if report.get("comparison", {}).get("regressions") else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
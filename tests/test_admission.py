@@ -0,0 +1,117 @@
+import sys
+import threading
+import time
+import unittest
+
+import NewAlpha
+from test_framing import free_port
+
+alpha = sys.modules[NewAlpha.AlphaSwitch.__module__]
+
+
+class RateLimiterTest(unittest.TestCase):
+    """Token buckets of AlphaRateLimiter (per sender, per port and global)."""
+
+    def setUp(self) -> None:
+        self.limiter = alpha.AlphaRateLimiter()
+
+    def test_no_limit_admits_everything(self) -> None:
+        self.assertFalse(self.limiter.enabled)
+        self.assertTrue(all(self.limiter.allow(20001) for _ in range(1000)))
+        self.assertEqual(self.limiter.limited, 0)
+
+    def test_burst_then_refill(self) -> None:
+        self.limiter.setLimit(10.0, burst=3)
+        self.assertEqual([self.limiter.allow(20001) for _ in range(4)], [True, True, True, False])
+        self.assertEqual(self.limiter.limited, 1)
+        self.assertTrue(self.limiter.allow(20002)) #Every sender has its own bucket
+
+        time.sleep(0.12) #One token refilled
+        self.assertEqual([self.limiter.allow(20001) for _ in range(2)], [True, False])
+
+    def test_port_limit_overrides_default(self) -> None:
+        self.limiter.setLimit(1.0, burst=1)
+        self.limiter.setLimit(100.0, burst=5, port=20003)
+        self.assertEqual(sum(self.limiter.allow(20003) for _ in range(10)), 5)
+        self.assertEqual(sum(self.limiter.allow(20004) for _ in range(10)), 1)
+
+        self.limiter.setLimit(None, port=20003) #Back to the default limit
+        self.limiter.setLimit(None)
+        self.assertFalse(self.limiter.enabled)
+
+    def test_global_bucket_is_shared_by_all_senders(self) -> None:
+        self.limiter.setGlobalLimit(10.0, burst=3)
+        self.assertEqual([self.limiter.allow(port) for port in (20005, 20006, 20007, 20008)], [True, True, True, False])
+        self.limiter.setGlobalLimit(None)
+        self.assertTrue(self.limiter.allow(20008))
+
+
+class OverflowPolicyTest(unittest.TestCase):
+    """Overflow policies of a switch with one worker and room for one waiting packet."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.switch_port = free_port()
+        cls.switch = NewAlpha.AlphaSwitch()
+        cls.switch.switchSetup(cls.switch_port, "127.0.0.1")
+        cls.thread = threading.Thread(target=cls.switch.serveForever, kwargs={"workers": 1}, daemon=True)
+        cls.thread.start()
+        time.sleep(0.2)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.switch.shutdown()
+        cls.thread.join(5)
+
+    def client(self) -> NewAlpha.AlphaClient:
+        client = NewAlpha.AlphaClient()
+        client.clientSetup(free_port(), "127.0.0.1")
+        client.bridge(self.switch_port, "127.0.0.1")
+        client.registerSwitch()
+        return client
+
+    def overflow(self, policy: str) -> list[str]:
+        """Keeps the worker busy, queues one packet and sends one more. Return: responses in the order the packets were sent"""
+        responder = self.client()
+        threading.Thread(target=responder.serveResponses, args=(lambda message, sender_port: (time.sleep(float(message)), f"ok:{message}")[1],), daemon=True).start()
+        self.addCleanup(responder.stopResponses)
+        senders = [self.client() for _ in range(3)]
+        time.sleep(0.1)
+        self.switch.setQueueLimit(1, policy)
+        self.addCleanup(self.switch.setQueueLimit, None)
+        self.switch.resetStats()
+
+        responses, threads = [None] * 3, []
+        def send(index: int, message: str) -> None:
+            responses[index] = senders[index].request(senders[index].encode_format(message, responder.port_))[0]
+        for index, message in enumerate(("0.3", "0.01", "0.01")):
+            threads.append(threading.Thread(target=send, args=(index, message)))
+            threads[-1].start()
+            time.sleep(0.05)
+        for thread in threads: thread.join(5)
+        return responses
+
+    def test_reject_answers_the_new_packet(self) -> None:
+        responses = self.overflow("reject")
+        self.assertEqual(responses[:2], ["ok:0.3", "ok:0.01"])
+        self.assertTrue(responses[2].startswith("$E6"))
+        self.assertEqual(self.switch.getStats()["admission"]["overflowed"], 1)
+
+    def test_drop_oldest_answers_the_waiting_packet(self) -> None:
+        responses = self.overflow("drop_oldest")
+        self.assertEqual(responses[0], "ok:0.3")
+        self.assertTrue(responses[1].startswith("$E6"))
+        self.assertEqual(responses[2], "ok:0.01")
+        self.assertEqual(self.switch.getStats()["admission"]["overflowed"], 1)
+
+    def test_block_waits_for_the_worker(self) -> None:
+        responses = self.overflow("block")
+        self.assertEqual(responses, ["ok:0.3", "ok:0.01", "ok:0.01"])
+        self.assertEqual(self.switch.getStats()["admission"]["overflowed"], 1)
+
+    def test_unknown_policy(self) -> None:
+        with self.assertRaises(ValueError): self.switch.setQueueLimit(1, "lifo")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import sys
+import threading
+import time
+import unittest
+
+import NewAlpha
+from test_framing import free_port
+
+alpha = sys.modules[NewAlpha.AlphaSwitch.__module__]
+
+
+class ResponseCacheTest(unittest.TestCase):
+    """Expiry, eviction, invalidation and caching flags of AlphaResponseCache."""
+
+    def test_flags_decide_what_is_stored(self) -> None:
+        cache = alpha.AlphaResponseCache()
+        cache.put(20001, b"a", b"unmarked")
+        cache.put(20001, b"b", b"cacheable", alpha._FLAG_CACHEABLE)
+        cache.put(20001, b"c", b"uncacheable", alpha._FLAG_UNCACHEABLE)
+        self.assertEqual([cache.get(20001, message) for message in (b"a", b"b", b"c")], [None, b"cacheable", None])
+
+        cache = alpha.AlphaResponseCache(cache_unmarked=True)
+        cache.put(20001, b"a", b"unmarked")
+        cache.put(20001, b"c", b"uncacheable", alpha._FLAG_UNCACHEABLE)
+        self.assertEqual([cache.get(20001, message) for message in (b"a", b"c")], [b"unmarked", None])
+
+    def test_ttl_expiry(self) -> None:
+        cache = alpha.AlphaResponseCache(ttl=0.05, cache_unmarked=True)
+        cache.put(20002, b"q", b"r")
+        self.assertEqual(cache.get(20002, b"q"), b"r")
+        time.sleep(0.07)
+        self.assertIsNone(cache.get(20002, b"q"))
+        self.assertEqual(cache.stats()["entries"], 0) #Dropped when it was looked up
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        cache = alpha.AlphaResponseCache(max_entries=2, cache_unmarked=True)
+        cache.put(20003, b"a", b"1")
+        cache.put(20003, b"b", b"2")
+        cache.get(20003, b"a")
+        cache.put(20003, b"c", b"3") #Evicts b
+        self.assertEqual([cache.get(20003, message) for message in (b"a", b"b", b"c")], [b"1", None, b"3"])
+
+    def test_invalidate_drops_only_the_port(self) -> None:
+        cache = alpha.AlphaResponseCache(cache_unmarked=True)
+        cache.put(20004, b"q", b"old")
+        cache.put(20005, b"q", b"other")
+        cache.invalidate(20004)
+        self.assertIsNone(cache.get(20004, b"q"))
+        self.assertEqual(cache.get(20005, b"q"), b"other")
+        cache.put(20004, b"q", b"new")
+        self.assertEqual(cache.get(20004, b"q"), b"new")
+
+    def test_stats(self) -> None:
+        cache = alpha.AlphaResponseCache(cache_unmarked=True)
+        cache.put(20006, b"q", b"r")
+        self.assertEqual(cache.get(20006, b"q"), b"r")
+        self.assertIsNone(cache.get(20006, b"x"))
+        cache.invalidate(20006)
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1, "invalidations": 1})
+
+
+class SwitchCacheTest(unittest.TestCase):
+    """Cached responses of a running switch are dropped when the recipient registers again or is removed."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.switch_port = free_port()
+        cls.switch = NewAlpha.AlphaSwitch()
+        cls.switch.switchSetup(cls.switch_port, "127.0.0.1")
+        cls.switch.setResponseCache(ttl=60.0)
+        cls.thread = threading.Thread(target=cls.switch.serveForever, kwargs={"workers": 4}, daemon=True)
+        cls.thread.start()
+        time.sleep(0.2)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.switch.shutdown()
+        cls.thread.join(5)
+
+    def setUp(self) -> None:
+        self.calls = 0
+
+    def client(self, port: int = None) -> NewAlpha.AlphaClient:
+        client = NewAlpha.AlphaClient()
+        client.clientSetup(port or free_port(), "127.0.0.1")
+        client.bridge(self.switch_port, "127.0.0.1")
+        client.registerSwitch()
+        return client
+
+    def handler(self, message: str, sender_port: int) -> NewAlpha.AlphaReply:
+        self.calls += 1
+        return NewAlpha.AlphaReply(f"{message}#{self.calls}", cacheable=message != "live")
+
+    def responder(self) -> NewAlpha.AlphaClient:
+        responder = self.client()
+        threading.Thread(target=responder.serveResponses, args=(self.handler,), daemon=True).start()
+        self.addCleanup(responder.stopResponses)
+        time.sleep(0.1)
+        return responder
+
+    def request(self, sender: NewAlpha.AlphaClient, message: str, port: int) -> str:
+        return sender.request(sender.encode_format(message, port))[0]
+
+    def test_cacheable_responses_are_cached(self) -> None:
+        sender, responder = self.client(), self.responder()
+        self.assertEqual([self.request(sender, "q", responder.port_) for _ in range(2)], ["q#1", "q#1"])
+        self.assertEqual([self.request(sender, "live", responder.port_) for _ in range(2)], ["live#2", "live#3"])
+
+    def test_reregistration_invalidates(self) -> None:
+        sender, responder = self.client(), self.responder()
+        self.assertEqual(self.request(sender, "q", responder.port_), "q#1")
+        responder.registerSwitch()
+        self.assertEqual(self.request(sender, "q", responder.port_), "q#2")
+
+    def test_removed_port_is_invalidated(self) -> None:
+        self.addCleanup(NewAlpha.AlphaSwitch.setToleration, NewAlpha.AlphaSwitch._blacklist_count)
+        NewAlpha.AlphaSwitch.setToleration(1)
+        sender, responder = self.client(), self.responder()
+        self.assertEqual(self.request(sender, "q", responder.port_), "q#1")
+        self.switch.__failed__(responder.port_)
+        self.assertNotIn(responder.port_, self.switch.clients_data)
+        self.assertIsNone(self.switch.response_cache.get(responder.port_, b"q"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import socket
+import threading
+import time
+import unittest
+
+import NewAlpha
+
+
+def free_port() -> int:
+    """Unused five-digit port (the text format requires five digits)."""
+    while True:
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        if port >= 10000: return port
+
+
+class FramingNegotiationTest(unittest.TestCase):
+    """Text/frame negotiation between clients and the switch, and the fallback to the text format."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.switch_port = free_port()
+        cls.switch = NewAlpha.AlphaSwitch()
+        cls.switch.switchSetup(cls.switch_port, "127.0.0.1")
+        cls.thread = threading.Thread(target=cls.switch.serveForever, kwargs={"workers": 4}, daemon=True)
+        cls.thread.start()
+        time.sleep(0.2)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.switch.shutdown()
+        cls.thread.join(5)
+
+    def tearDown(self) -> None:
+        NewAlpha.AlphaClient.setFraming(True)
+
+    def client(self, port: int, framing: bool = True, handler=None) -> NewAlpha.AlphaClient:
+        NewAlpha.AlphaClient.setFraming(framing)
+        client = NewAlpha.AlphaClient()
+        client.clientSetup(port, "127.0.0.1")
+        client.bridge(self.switch_port, "127.0.0.1")
+        client.registerSwitch()
+        if handler is not None:
+            threading.Thread(target=client.serveResponses, args=(handler,), daemon=True).start()
+            self.addCleanup(client.stopResponses)
+            time.sleep(0.1)
+        return client
+
+    def test_framed_and_text_clients_reach_each_other(self) -> None:
+        framed_port, text_port = free_port(), free_port()
+        framed = self.client(framed_port, handler=lambda message, port: f"framed:{message}")
+        text = self.client(text_port, framing=False, handler=lambda message, port: f"text:{message}")
+        self.assertTrue(framed.framing_)
+        self.assertFalse(text.framing_)
+        self.assertEqual(text.request(text.encode_format("hi", framed_port)), ("framed:hi", framed_port))
+        self.assertEqual(framed.request(framed.encode_format("hi", text_port)), ("text:hi", text_port))
+
+    def test_register_without_framing_falls_back_to_text(self) -> None:
+        sender, port = self.client(free_port()), free_port()
+        self.client(port)
+        self.assertIn(port, self.switch.clients_framed)
+
+        recipient = self.client(port, framing=False, handler=lambda message, sender_port: f"text:{message}")
+        self.assertFalse(recipient.framing_)
+        self.assertNotIn(port, self.switch.clients_framed)
+        self.assertEqual(sender.request(sender.encode_format("hi", port)), ("text:hi", port))
+
+
+if __name__ == "__main__":
+    unittest.main()
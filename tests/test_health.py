@@ -0,0 +1,105 @@
+import sys
+import time
+import unittest
+from unittest import mock
+
+import NewAlpha
+
+alpha = sys.modules[NewAlpha.AlphaSwitch.__module__]
+
+
+class HealthTrackerTest(unittest.TestCase):
+    """Circuit breaker states of AlphaHealthTracker and its shared memory variant (sharded switch)."""
+
+    trackers = (alpha.AlphaHealthTracker, alpha._SharedHealthTracker)
+
+    def test_closed_open_half_open_closed(self) -> None:
+        for tracker_type in self.trackers:
+            with self.subTest(tracker_type.__name__):
+                tracker = tracker_type()
+                self.assertEqual(tracker.state(20001), "closed")
+                self.assertTrue(tracker.allow(20001))
+
+                self.assertEqual(tracker.failure(20001, 0.02, 0.02), 1)
+                self.assertEqual(tracker.state(20001), "open")
+                self.assertFalse(tracker.allow(20001))
+
+                time.sleep(0.03)
+                self.assertTrue(tracker.allow(20001)) #The probe
+                self.assertEqual(tracker.state(20001), "half-open")
+                self.assertFalse(tracker.allow(20001)) #Only one probe at a time
+
+                tracker.success(20001)
+                self.assertEqual(tracker.state(20001), "closed")
+                self.assertTrue(tracker.allow(20001))
+                self.assertEqual(tracker.snapshot(), {})
+
+    def test_failed_probe_reopens_with_longer_backoff(self) -> None:
+        for tracker_type in self.trackers:
+            with self.subTest(tracker_type.__name__):
+                tracker = tracker_type()
+                tracker.failure(20002, 0.02, 1.0)
+                time.sleep(0.03)
+                self.assertTrue(tracker.allow(20002))
+                self.assertEqual(tracker.failure(20002, 0.02, 1.0), 2)
+                self.assertEqual(tracker.state(20002), "open")
+                retry_in = tracker.snapshot()["20002"]["retry_in"]
+                self.assertGreater(retry_in, 0.015) #Between half and all of 0.02 * 2
+                self.assertLessEqual(retry_in, 0.04)
+
+    def test_backoff_is_capped(self) -> None:
+        tracker = alpha.AlphaHealthTracker()
+        for _ in range(10): tracker.failure(20003, 0.5, 0.1)
+        self.assertLessEqual(tracker.snapshot()["20003"]["retry_in"], 0.1)
+
+    def test_probe_timeout_lets_another_probe_through(self) -> None:
+        for tracker_type in self.trackers:
+            with self.subTest(tracker_type.__name__), mock.patch.object(alpha, "_PROBE_TIMEOUT", 0.05):
+                tracker = tracker_type()
+                tracker.failure(20004, 0.01, 0.01)
+                time.sleep(0.02)
+                self.assertTrue(tracker.allow(20004))
+                self.assertFalse(tracker.allow(20004)) #Probe still running
+                time.sleep(0.06)
+                self.assertTrue(tracker.allow(20004)) #Probe hangs, replaced
+                self.assertEqual(tracker.state(20004), "half-open")
+
+    def test_shared_tracker_takes_over_failures(self) -> None:
+        tracker = alpha.AlphaHealthTracker()
+        tracker.failure(20005, 10.0, 10.0)
+        shared = alpha._SharedHealthTracker(tracker)
+        self.assertEqual(shared.state(20005), "open")
+        self.assertFalse(shared.allow(20005))
+        self.assertEqual(shared.snapshot()["20005"]["failures"], 1)
+
+
+class TolerationTest(unittest.TestCase):
+    """Removal of ports that did not respond setToleration() times in a row."""
+
+    def setUp(self) -> None:
+        self.addCleanup(NewAlpha.AlphaSwitch.setToleration, NewAlpha.AlphaSwitch._blacklist_count)
+        self.switch = NewAlpha.AlphaSwitch()
+        self.switch.clients_data[20010] = "127.0.0.1"
+        self.switch.clients_framed.add(20010)
+
+    def test_port_removed_after_toleration(self) -> None:
+        NewAlpha.AlphaSwitch.setToleration(3)
+        for _ in range(2):
+            self.switch.__failed__(20010)
+            self.assertIn(20010, self.switch.clients_data)
+        self.assertEqual(self.switch.health.state(20010), "open")
+
+        self.switch.__failed__(20010)
+        self.assertNotIn(20010, self.switch.clients_data)
+        self.assertNotIn(20010, self.switch.clients_framed)
+
+    def test_response_resets_the_count(self) -> None:
+        NewAlpha.AlphaSwitch.setToleration(2)
+        self.switch.__failed__(20010)
+        self.switch.__health__(20010, True)
+        self.switch.__failed__(20010)
+        self.assertIn(20010, self.switch.clients_data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import NewAlpha
+
+alpha = sys.modules[NewAlpha.AlphaSwitch.__module__]
+
+
+def record(number: int, sender_port: int = 20001, recipient_port: int = 20002, timestamp: float = None) -> "alpha.AlphaLogRecord":
+    return alpha.AlphaLogRecord(number, 1000.0 + number if timestamp is None else timestamp, sender_port, recipient_port, 2, 3, 0.001,
+                                alpha._STATUS_FORWARDED, f"{sender_port}:m{number}:{recipient_port}", f"{recipient_port}:r{number}:{sender_port}")
+
+
+class TrafficLogTest(unittest.TestCase):
+    """Ring buffer, query filters and spill files of AlphaTrafficLog."""
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "traffic.log")
+
+    def spill(self, log: NewAlpha.AlphaTrafficLog, max_bytes: int = 10_000_000, backups: int = 3) -> None:
+        log.spill(self.path, max_bytes, backups)
+        self.addCleanup(log.spill, None) #Closes the file
+
+    def two_records(self) -> int:
+        """Spill file size after two records (rotated right after them)."""
+        entry = record(1)
+        return len(alpha._LOG_MAGIC) + 2 * (alpha._LOG_ENTRY.size + len(entry.request) + len(entry.response))
+
+    def test_ring_keeps_the_newest_records(self) -> None:
+        log = NewAlpha.AlphaTrafficLog(capacity=3)
+        for number in range(1, 6): log.append(record(number))
+        self.assertEqual(len(log), 3)
+        self.assertEqual([entry.number for entry in log.query()], [3, 4, 5])
+        self.assertIn("Package[5]", log[-1])
+        self.assertIn("20001:m3:20002", list(log)[0])
+
+        log.setCapacity(2)
+        self.assertEqual([entry.number for entry in log.query()], [4, 5])
+
+    def test_query_by_port_and_time(self) -> None:
+        log = NewAlpha.AlphaTrafficLog()
+        log.append(record(1, 20001, 20002))
+        log.append(record(2, 20003, 20001))
+        log.append(record(3, 20003, 20004))
+        self.assertEqual([entry.number for entry in log.query(port=20001)], [1, 2])
+        self.assertEqual([entry.number for entry in log.query(since=1002.0)], [2, 3])
+        self.assertEqual([entry.number for entry in log.query(until=1002.0)], [1, 2])
+        self.assertEqual([entry.number for entry in log.query(port=20003, since=1003.0, until=1003.0)], [3])
+
+    def test_replay_returns_the_spilled_records(self) -> None:
+        log = NewAlpha.AlphaTrafficLog(capacity=1)
+        self.spill(log)
+        records = [record(number) for number in range(1, 4)]
+        for entry in records: log.append(entry)
+        log.flush()
+        self.assertEqual(list(NewAlpha.AlphaTrafficLog.replay(self.path)), records)
+        self.assertEqual([entry.number for entry in NewAlpha.AlphaTrafficLog.replay(self.path, since=1002.0, until=1002.0)], [2])
+
+    def test_replay_filters_by_port(self) -> None:
+        log = NewAlpha.AlphaTrafficLog()
+        self.spill(log)
+        log.append(record(1, 20001, 20002))
+        log.append(record(2, 20003, 20004))
+        log.flush()
+        self.assertEqual([entry.number for entry in NewAlpha.AlphaTrafficLog.replay(self.path, port=20004)], [2])
+
+    def test_rotation_keeps_backups(self) -> None:
+        log = NewAlpha.AlphaTrafficLog()
+        self.spill(log, self.two_records(), backups=2)
+        for number in range(1, 8): log.append(record(number)) #Rotated after 2, 4 and 6, the oldest backup is dropped
+        log.flush()
+        self.assertTrue(os.path.exists(f"{self.path}.2"))
+        self.assertFalse(os.path.exists(f"{self.path}.3"))
+        self.assertEqual([entry.number for entry in NewAlpha.AlphaTrafficLog.replay(self.path)], [3, 4, 5, 6, 7]) #Oldest first
+
+    def test_rotation_without_backups(self) -> None:
+        log = NewAlpha.AlphaTrafficLog()
+        self.spill(log, self.two_records(), backups=0)
+        for number in range(1, 4): log.append(record(number)) #Rotated after 2
+        log.flush()
+        self.assertFalse(os.path.exists(f"{self.path}.1"))
+        self.assertEqual([entry.number for entry in NewAlpha.AlphaTrafficLog.replay(self.path)], [3])
+
+    def test_replay_rejects_other_files(self) -> None:
+        with open(self.path, "wb") as other: other.write(b"not a log")
+        with self.assertRaises(ValueError): list(NewAlpha.AlphaTrafficLog.replay(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import threading
+import time
+import unittest
+
+import NewAlpha
+from test_framing import free_port
+
+
+class ResponseMethodTest(unittest.TestCase):
+    """Failing handlers and requests that arrive between dynamicResponse()/confirmationResponse() calls."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.switch_port = free_port()
+        cls.switch = NewAlpha.AlphaSwitch()
+        cls.switch.switchSetup(cls.switch_port, "127.0.0.1")
+        cls.thread = threading.Thread(target=cls.switch.serveForever, kwargs={"workers": 4}, daemon=True)
+        cls.thread.start()
+        time.sleep(0.2)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.switch.shutdown()
+        cls.thread.join(5)
+
+    def client(self) -> NewAlpha.AlphaClient:
+        client = NewAlpha.AlphaClient()
+        client.clientSetup(free_port(), "127.0.0.1")
+        client.bridge(self.switch_port, "127.0.0.1")
+        client.registerSwitch()
+        return client
+
+    def test_failing_handler_is_answered_and_reported(self) -> None:
+        def handler(message: str, sender_port: int) -> str:
+            if message == "bad": raise ValueError(message)
+            return f"ok:{message}"
+
+        errors = []
+        sender, responder = self.client(), self.client()
+        responder.setErrorHandler(lambda error, message, sender_port: errors.append((type(error), message, sender_port)))
+        threading.Thread(target=responder.serveResponses, args=(handler,), daemon=True).start()
+        self.addCleanup(responder.stopResponses)
+        time.sleep(0.1)
+
+        for _ in range(3):
+            response, port = sender.request(sender.encode_format("bad", responder.port_))
+            self.assertTrue(response.startswith("$E7"))
+            self.assertEqual(port, responder.port_)
+        self.assertEqual(sender.request(sender.encode_format("good", responder.port_)), ("ok:good", responder.port_))
+        self.assertEqual(errors, [(ValueError, "bad", sender.port_)] * 3)
+        self.assertEqual(self.switch.health.state(responder.port_), "closed")
+        self.assertIn(responder.port_, self.switch.clients_data)
+
+    def test_requests_between_calls_wait_for_refresh_time(self) -> None:
+        sender, responder = self.client(), self.client()
+        self.addCleanup(responder.stopResponses)
+        self.assertEqual(responder.dynamicResponse({"hi": "hello"}, 0.3), (None, None, None))
+
+        started = time.monotonic()
+        self.assertEqual(sender.request(sender.encode_format("hi", responder.port_)), ("None", responder.port_))
+        self.assertLess(time.monotonic() - started, 2.0)
+
+        threading.Thread(target=lambda: (time.sleep(0.1), sender.request(sender.encode_format("hi", responder.port_))), daemon=True).start()
+        self.assertEqual(responder.dynamicResponse({"hi": "hello"}, 2.0), ("hi", "hello", sender.port_))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import time
+import unittest
+
+import NewAlpha
+
+
+class RouterPrecedenceTest(unittest.TestCase):
+    """Order in which AlphaRouter checks its rules: exact, longest prefix, regex, predicate, default."""
+
+    def setUp(self) -> None:
+        self.router = NewAlpha.AlphaRouter({"ping": "pong", "sensor/1": "exact"}, default="unknown")
+        self.router.prefix("sensor/", lambda message, sender_port, rest: f"sensor {rest}")
+        self.router.prefix("sensor/temp/", lambda message, sender_port, rest: f"temp {rest}")
+        self.router.regex(r"set ([a-z]+) ([0-9]+)", lambda message, sender_port, match: f"{match[1]}={match[2]}")
+        self.router.regex(r"set .*", "any set")
+        self.router.predicate(str.isdigit, lambda message, sender_port: int(message) * 2)
+        self.router.predicate(lambda message: message.endswith("?"), lambda message, sender_port: f"question from {sender_port}")
+
+    def test_exact_before_prefix(self) -> None:
+        self.assertEqual(self.router.resolve("ping"), "pong")
+        self.assertEqual(self.router.resolve("sensor/1"), "exact")
+
+    def test_longest_prefix_wins(self) -> None:
+        self.assertEqual(self.router.resolve("sensor/2"), "sensor 2")
+        self.assertEqual(self.router.resolve("sensor/temp/3"), "temp 3")
+        self.assertEqual(self.router.resolve("sensor/tem"), "sensor tem")
+
+    def test_regex_matches_the_whole_message_in_order(self) -> None:
+        self.assertEqual(self.router.resolve("set speed 10"), "speed=10")
+        self.assertEqual(self.router.resolve("set speed fast"), "any set")
+        self.assertEqual(self.router.resolve("please set speed 10"), "unknown") #No partial matches
+
+    def test_predicates_in_order_then_default(self) -> None:
+        self.assertEqual(self.router.resolve("21"), 42)
+        self.assertEqual(self.router.resolve("why?", 20001), "question from 20001")
+        self.assertEqual(self.router.resolve("nothing"), "unknown")
+
+    def test_prefix_before_regex(self) -> None:
+        self.router.regex(r"sensor/[0-9]+", "regex")
+        self.assertEqual(self.router.resolve("sensor/5"), "sensor 5")
+
+    def test_usable_as_handler(self) -> None:
+        self.assertEqual(self.router("why?", 20002), "question from 20002")
+
+
+class RouterMemoTest(unittest.TestCase):
+    """Memoized responses of pure handlers."""
+
+    def setUp(self) -> None:
+        self.calls = 0
+
+    def handler(self, message: str, sender_port: int, rest: str = None) -> str:
+        self.calls += 1
+        return f"{message}#{self.calls}"
+
+    def test_pure_handler_is_called_once_per_message(self) -> None:
+        router = NewAlpha.AlphaRouter()
+        router.prefix("q/", self.handler, pure=True)
+        self.assertEqual([router.resolve("q/a"), router.resolve("q/a"), router.resolve("q/b")], ["q/a#1", "q/a#1", "q/b#2"])
+        self.assertEqual(self.calls, 2)
+
+    def test_impure_handler_is_called_every_time(self) -> None:
+        router = NewAlpha.AlphaRouter()
+        router.exact("q", self.handler)
+        self.assertEqual([router.resolve("q"), router.resolve("q")], ["q#1", "q#2"])
+
+    def test_ttl_expires_memoized_responses(self) -> None:
+        router = NewAlpha.AlphaRouter()
+        router.exact("q", self.handler, pure=True, ttl=0.05)
+        self.assertEqual(router.resolve("q"), "q#1")
+        self.assertEqual(router.resolve("q"), "q#1")
+        time.sleep(0.07)
+        self.assertEqual(router.resolve("q"), "q#2")
+
+    def test_cache_size_evicts_least_recently_used(self) -> None:
+        router = NewAlpha.AlphaRouter(cache_size=2)
+        router.predicate(lambda message: True, self.handler, pure=True)
+        for message in ("a", "b", "a", "c"): router.resolve(message) #c evicts b
+        self.assertEqual(router.resolve("a"), "a#1")
+        self.assertEqual(router.resolve("b"), "b#4")
+
+
+if __name__ == "__main__":
+    unittest.main()